@@ -1,8 +1,12 @@
 """Repository for all Blob classes and related methods"""
+import math
 import random
 from typing import List
 from helpers import find_closest_coord
 
+# Bind module-level names once so hot paths skip the random module lookup
+_rand = random.random
+
 
 class BaseBlob:
     """
@@ -22,22 +26,51 @@ class BaseBlob:
         y (float): y-coordinate of Blob
         size (float): effective size of blob
         step (float): increment at which blob moves across environment
+
+    Starting values of these attributes are read from the underscored
+    class-level defaults below, so subclasses only override those defaults
+    rather than __init__. name, color, mutation_class and repr_class are
+    plain class attributes shared by every blob of a class
     """
 
+    __slots__ = (
+        "survival_prob",
+        "reproduction_prob",
+        "mutation_prob",
+        "x",
+        "y",
+        "size",
+        "step",
+        # Lets single blobs override class attributes such as repr_class,
+        # as helpers.set_classes_of_population does
+        "__dict__",
+    )
+
+    # Constant per class, so looked up on the type rather than stored on each
+    # blob. Classes not yet defined here are attached at the bottom of the
+    # module
+    name = "BaseBlob"
+    color = "blue"
+    mutation_class = None
+    repr_class = None
+
+    _survival_prob = 0.5
+    _reproduction_prob = 0.5
+    _mutation_prob = 0.5
+    _size = 0.1
+    _step = 0.1
+
     def __init__(self) -> None:
-        """Inits BaseBlob"""
-        self.name: str = "BaseBlob"
-        self.survival_prob: float = 0.5
-        self.reproduction_prob: float = 0.5
-        self.mutation_prob: float = 0.5
-
-        self.mutation_class: Callable = MutatedBaseBlob
-        self.repr_class: Callable = BaseBlob
-        self.color: str = "blue"
-        self.x = random.random()
-        self.y = random.random()
-        self.size = 0.1
-        self.step = 0.1
+        """Inits BaseBlob, writing each attribute exactly once"""
+        cls = type(self)
+        self.survival_prob = cls._survival_prob
+        self.reproduction_prob = cls._reproduction_prob
+        self.mutation_prob = cls._mutation_prob
+
+        self.x = _rand()
+        self.y = _rand()
+        self.size = cls._size
+        self.step = cls._step
 
     def reproduce(self):
         """
@@ -46,13 +79,12 @@ class BaseBlob:
 
         Returns:
             (Blob): the type of Blob produced will depend on the mutation_class
-            and repr_class attributes declared in __init__
+            and repr_class attributes declared on the class
         """
         if self.mutation_prob >= 0.01:
             #Enforce minimum for mutation_prob to eliminate floating point
             #comparison issues
-            mutation_event = random.random()
-            if mutation_event <= self.mutation_prob:
+            if _rand() <= self.mutation_prob:
                 return self.mutation_class()
         return self.repr_class()
 
@@ -65,8 +97,9 @@ class BaseBlob:
             is mute since the blobs don't actually move towards the coord
         """
         # Move in random direction (-1 or +1) in increments of step
-        self.x += self.step * [-1, 1][random.randrange(2)]
-        self.y += self.step * [-1, 1][random.randrange(2)]
+        s = self.step
+        self.x += s if _rand() < 0.5 else -s
+        self.y += s if _rand() < 0.5 else -s
 
     def set_probs(
         self, survival_prob: float, repr_prob: float, mutation_prob: float
@@ -78,54 +111,50 @@ class BaseBlob:
 
     def __str__(self):
         """Prints out name of blob"""
-        return (
-            f"""{self.name}(s={self.survival_prob},"""
-            f"""r={self.reproduction_prob},m={self.mutation_prob})"""
+        return "%s(s=%s,r=%s,m=%s)" % (
+            self.name,
+            self.survival_prob,
+            self.reproduction_prob,
+            self.mutation_prob,
         )
 
 
 class PerfectTestBlob(BaseBlob):
     """Blob with 1.0 for all attrs. Used primarily for testing"""
 
-    def __init__(self) -> None:
-        super().__init__()
-        self.name: str = "PerfectTestBlob"
-        self.repr_class: Callable = MutatedBaseBlob
+    __slots__ = ()
+
+    name = "PerfectTestBlob"
 
 
 class MutatedBaseBlob(BaseBlob):
     """Class for mutated base blob"""
 
-    def __init__(self) -> None:
-        super().__init__()
-        self.name: str = "MutatedBaseBlob"
-        self.color: str = "red"
-        self.repr_class: Callable = MutatedBaseBlob
+    __slots__ = ()
+
+    name = "MutatedBaseBlob"
+    color = "red"
 
 
 class SturdyBlob(BaseBlob):
     """Class for generic sturdy blob"""
 
-    def __init__(self) -> None:
-        super().__init__()
-        self.name: str = "SturdyBlob"
-        self.color: str = "green"
-        self.repr_class: Callable = SturdyBlob
-        self.survival_prob: float = 0.8
-        self.reproduction_prob: float = 0.5
-        self.mutation_prob: float = 0.0
+    __slots__ = ()
+
+    name = "SturdyBlob"
+    color = "green"
+    _survival_prob = 0.8
+    _reproduction_prob = 0.5
+    _mutation_prob = 0.0
 
 
 class HungryBlob(BaseBlob):
     """Class for Blob with detection sense for where food is"""
 
-    def __init__(self) -> None:
-        """See parent docstrings"""
-        super().__init__()
-        self.name: str = "HungryBlob"
-        self.color = "purple"
-        self.mutation_class: Callable = MutatedHungryBlob
-        self.repr_class: Callable = HungryBlob
+    __slots__ = ()
+
+    name = "HungryBlob"
+    color = "purple"
 
     def move(self, coords: tuple) -> None:
         """
@@ -135,39 +164,35 @@ class HungryBlob(BaseBlob):
         Args:
             coords (tuple): coordinates to move towards
         """
-        self.x += self.step * (1 if self.x < coords[0] else -1)
-        self.y += self.step * (1 if self.y < coords[1] else -1)
+        # Take sign of step from difference rather than branching on it
+        self.x += math.copysign(self.step, coords[0] - self.x)
+        self.y += math.copysign(self.step, coords[1] - self.y)
 
 
 class MutatedHungryBlob(HungryBlob):
     """Class for Mutated Blob with detection sense for where food is. This
     blob is bigger and faster than the base food sense blob"""
 
-    def __init__(self) -> None:
-        """See parent docstrings"""
-        super().__init__()
-        self.name: str = "MutatedHungryBlob"
-        self.color = "pink"
-        self.size = 0.3
-        self.step = 0.3
-        self.repr_class: Callable = MutatedHungryBlob
+    __slots__ = ()
+
+    name = "MutatedHungryBlob"
+    color = "pink"
+    _size = 0.3
+    _step = 0.3
 
 
 class BaseInteractingBlob(HungryBlob):
     """Base class for Blob that can interact with other blobs. Note that
     this blob is hungry by default"""
 
-    def __init__(self) -> None:
-        """See parent docstrings"""
-        super().__init__()
-        self.name: str = "BaseInteractingBlob"
-        self.color = "gray"
-        self.survival_prob: float = 0.8
-        self.reproduction_prob: float = 0.5
-        self.mutation_prob: float = 0.0
-        self.size = 0.3
-        self.mutation_class: Callable = BaseInteractingBlob
-        self.repr_class: Callable = BaseInteractingBlob
+    __slots__ = ()
+
+    name = "BaseInteractingBlob"
+    color = "gray"
+    _survival_prob = 0.8
+    _reproduction_prob = 0.5
+    _mutation_prob = 0.0
+    _size = 0.3
 
     def interact_with_surroundings(self, interaction_list: List) -> None:
         """
@@ -181,14 +206,16 @@ class BaseInteractingBlob(HungryBlob):
 class AttackingBlob(BaseInteractingBlob):
     """Class for Blob that will attack other nearby blobs"""
 
+    __slots__ = ("attack_dmg",)
+
+    name = "AttackingBlob"
+    color = "red"
+    _attack_dmg = 0.2
+
     def __init__(self) -> None:
         """See parent docstrings"""
         super().__init__()
-        self.name: str = "AttackingBlob"
-        self.color = "red"
-        self.mutation_class: Callable = AttackingBlob
-        self.repr_class: Callable = AttackingBlob
-        self.attack_dmg = 0.2
+        self.attack_dmg = self._attack_dmg
 
     def interact_with_surroundings(self, interaction_list: List) -> None:
         """
@@ -204,13 +231,10 @@ class AttackingBlob(BaseInteractingBlob):
 class TimidBlob(BaseInteractingBlob):
     """Class for Blob that will run away from other aggressive blobs"""
 
-    def __init__(self) -> None:
-        """See parent docstrings"""
-        super().__init__()
-        self.name: str = "TimidBlob"
-        self.color = "green"
-        self.mutation_class: Callable = TimidBlob
-        self.repr_class: Callable = TimidBlob
+    __slots__ = ()
+
+    name = "TimidBlob"
+    color = "green"
 
     def run_away(self, coords: tuple) -> None:
         """
@@ -219,8 +243,8 @@ class TimidBlob(BaseInteractingBlob):
         Args:
             coords (tuple): (x,y) of blob to run away from
         """
-        self.x -= self.step * (1 if self.x < coords[0] else -1)
-        self.y -= self.step * (1 if self.y < coords[1] else -1)
+        self.x -= math.copysign(self.step, coords[0] - self.x)
+        self.y -= math.copysign(self.step, coords[1] - self.y)
 
     def interact_with_surroundings(self, interaction_list: List) -> None:
         """
@@ -228,9 +252,13 @@ class TimidBlob(BaseInteractingBlob):
         blob
 
         Args:
-            interaction_list (List): list of blobs to attack
+            interaction_list (List): list of nearby blobs
         """
-        blob_coords = [(b.x, b.y) for b in interaction_list]
+        blob_coords = [
+            (b.x, b.y)
+            for b in interaction_list
+            if isinstance(b, AttackingBlob)
+        ]
         closest_attacker_coords, _ = find_closest_coord(
             (self.x, self.y), blob_coords
         )
@@ -242,10 +270,26 @@ class QuickBlob(BaseInteractingBlob):
     """Class for very quick blob. QuickBlobs eat before any other blob, at
     the expense of a generally lower survival_prob"""
 
-    def __init__(self) -> None:
-        """See parent docstrings"""
-        super().__init__()
-        self.name: str = "QuickBlob"
-        self.color = "yellow"
-        self.mutation_class: Callable = QuickBlob
-        self.repr_class: Callable = QuickBlob
+    __slots__ = ()
+
+    name = "QuickBlob"
+    color = "yellow"
+
+
+# Attach classes referenced by other classes now that all are defined
+BaseBlob.mutation_class = MutatedBaseBlob
+BaseBlob.repr_class = BaseBlob
+PerfectTestBlob.repr_class = MutatedBaseBlob
+MutatedBaseBlob.repr_class = MutatedBaseBlob
+SturdyBlob.repr_class = SturdyBlob
+HungryBlob.mutation_class = MutatedHungryBlob
+HungryBlob.repr_class = HungryBlob
+MutatedHungryBlob.repr_class = MutatedHungryBlob
+BaseInteractingBlob.mutation_class = BaseInteractingBlob
+BaseInteractingBlob.repr_class = BaseInteractingBlob
+AttackingBlob.mutation_class = AttackingBlob
+AttackingBlob.repr_class = AttackingBlob
+TimidBlob.mutation_class = TimidBlob
+TimidBlob.repr_class = TimidBlob
+QuickBlob.mutation_class = QuickBlob
+QuickBlob.repr_class = QuickBlob
@@ -1,14 +1,27 @@
 """Repository for all Environment related classes"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+from operator import attrgetter
 from typing import List, Dict
 from pathlib import Path
 from time import sleep
-import random
 from IPython.display import clear_output
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import seaborn as sns
 import numpy as np
-from blobs import BaseBlob
+from blobs import BaseBlob, AttackingBlob, TimidBlob
+from population import (
+    COLOR_REGISTRY,
+    NAME_REGISTRY,
+    BlobPopulation,
+    EpochBuffers,
+    EpochDraws,
+    GenerationTable,
+    find_closest_coords,
+    registered_values,
+    reproduce_all,
+)
 from settings import (
     ENVIRONMENT_DIMENSIONS,
     BLOB_DISPLAY_SIZE,
@@ -30,6 +43,9 @@ class BaseEnvironment:
         dimension (int): dimension of environment for Blobs to interact in.
             Note that dimension will be broadcast to a square environment
         population (List): container of all Blobs that exist in Environment
+        tables (List): GenerationTable of each generation in population
+        event_buf (np.ndarray): scratch buffer for event draws, see
+            event_buffer
     """
 
     def __init__(self) -> None:
@@ -38,6 +54,8 @@ class BaseEnvironment:
         """
         self.dimension: int = ENVIRONMENT_DIMENSIONS
         self.population: List = []
+        self.tables: List = []
+        self.event_buf: np.ndarray = np.empty(0)
 
     def spawn_population(self, pop: List) -> None:
         """
@@ -47,39 +65,116 @@ class BaseEnvironment:
         Args:
             pop (List): list of Blobs to add to population
         """
-        pop.sort(key=lambda x: x.name)
-        pop_arr = np.array(pop)
-        self.population.append(pop_arr)
-        types, _ = get_pivot_indices(pop)
+        pop.sort(key=attrgetter("name"))
+        self.append_generation(np.array(pop))
+
+    def append_generation(self, generation: np.ndarray) -> None:
+        """
+        Appends generation to population along with its GenerationTable
+
+        Args:
+            generation (np.ndarray): Blobs of generation, sorted by name
+        """
+        self.population.append(generation)
+        self.tables.append(GenerationTable.from_blobs(generation))
+
+    def refresh_table(self) -> GenerationTable:
+        """
+        Rebuilds GenerationTable of most recent generation from its blobs, so
+        that changes made to blobs after the generation was appended, e.g.
+        through set_probs, are picked up
+
+        Returns:
+            (GenerationTable): table of most recent generation
+        """
+        self.tables[-1] = GenerationTable.from_blobs(self.population[-1])
+        return self.tables[-1]
+
+    def event_buffer(self, n: int) -> np.ndarray:
+        """
+        Scratch buffer for the event draws of apply_mask_to_population,
+        reused from generation to generation. Like EpochBuffers, capacity
+        doubles whenever a generation outgrows it. Each environment keeps its
+        own buffer, so environments never overwrite each other's draws
+
+        Args:
+            n (int): number of blobs
+        Returns:
+            (np.ndarray): first n entries of the buffer
+        """
+        if n > self.event_buf.shape[0]:
+            self.event_buf = np.empty(max(n, 2 * self.event_buf.shape[0]))
+        return self.event_buf[:n]
 
     def interact(self) -> None:
         """
         Enables most recent population to interact with environmental
         parameters.
         """
-        # Get relevant attrs. For this Environment, survival, reproduction,
-        # and mutation
-        surv_attrs = get_generation_attributes(
-            self.population[-1], "survival_prob"
-        )
-        repr_attrs = get_generation_attributes(
-            self.population[-1], "reproduction_prob"
-        )
+        # Relevant attrs are read straight from the generation's columns.
+        # For this Environment, survival, reproduction, and mutation
+        table = self.refresh_table()
 
         # Kill off some portion of population based off Blob survival attrs
         surv_pop, surv_mask = apply_mask_to_population(
-            self.population[-1], surv_attrs
+            self.population[-1],
+            table.survival_prob,
+            out=self.event_buffer(len(table)),
         )
 
         # Surviving population reproduced based off Blob reproduction attrs
-        repr_attrs = repr_attrs[surv_mask]
-        repr_pop, _ = apply_mask_to_population(surv_pop, repr_attrs)
+        repr_attrs = table.reproduction_prob[surv_mask]
+        repr_pop, _ = apply_mask_to_population(
+            surv_pop, repr_attrs, out=self.event_buffer(len(surv_pop))
+        )
 
         # Each blob will reproduce, with a chance of mutation
-        new_blobs = [b.reproduce() for b in repr_pop]
+        new_blobs = reproduce_all(repr_pop)
+
+        # Survivors keep their rows, so only offspring need to be gathered.
+        # Both blobs and rows are then sorted by name like merge_populations
+        new_arr = np.empty(len(new_blobs), dtype=object)
+        new_arr[:] = new_blobs
+        merged = np.concatenate((surv_pop, new_arr))
+        merged_table = GenerationTable.concat(
+            [table.select(surv_mask), GenerationTable.from_blobs(new_blobs)]
+        )
+        order = np.argsort(merged_table.names(), kind="stable")
+        self.population.append(merged[order])
+        self.tables.append(merged_table.select(order))
 
-        # Save instances that survived and new instances, add to population
-        self.population.append(merge_populations(surv_pop, new_blobs))
+    def scatter_generation(self, ax, generation_idx: int) -> None:
+        """
+        Plots blobs of a single generation onto ax in a single scatter, with
+        one legend entry per blob type
+
+        Args:
+            ax (matplotlib.axes.Axes): axes to plot onto
+            generation_idx (int): idx of generation within population
+        """
+        table = self.tables[generation_idx]
+        names = registered_values(NAME_REGISTRY)
+        colors = registered_values(COLOR_REGISTRY)
+        ax.scatter(
+            x=table.x * self.dimension,
+            y=table.y * self.dimension,
+            c=colors[table.color_id],
+            s=BLOB_DISPLAY_SIZE,
+        )
+
+        # Scatter has no per-type labels, so legend uses proxy markers
+        name_ids, first_idx, counts = np.unique(
+            table.name_id, return_index=True, return_counts=True
+        )
+        for name_id, idx, count in zip(name_ids, first_idx, counts):
+            ax.plot(
+                [],
+                [],
+                marker="o",
+                linestyle="",
+                color=colors[table.color_id[idx]],
+                label=f"{names[name_id]} - {count}",
+            )
 
     def show_one_generation(self, generation_idx: int) -> None:
         """
@@ -89,23 +184,8 @@ class BaseEnvironment:
         Args:
             generation_idx (int): idx of generation within population
         """
-        current_gen = self.population[generation_idx]
-        types = list(set([b.name for b in current_gen]))
-
         fig, ax = plt.subplots(nrows=1, ncols=1, figsize=FIG_DIMENSIONS)
-        for idx, t in enumerate(types):
-            t_idx = [
-                i for i in range(len(current_gen)) if current_gen[i].name == t
-            ]
-            t_population = [current_gen[i] for i in t_idx]
-
-            ax.scatter(
-                x=[s.x * self.dimension for s in t_population],
-                y=[s.y * self.dimension for s in t_population],
-                color=t_population[0].color,
-                s=BLOB_DISPLAY_SIZE,
-                label=f"{types[idx]} - {len(t_population)}",
-            )
+        self.scatter_generation(ax, generation_idx)
 
         plt.title(
             f"Generation {generation_idx}:{len(self.population[generation_idx])} blobs",
@@ -168,49 +248,136 @@ class EnvironmentWithFood(BaseEnvironment):
 
     Attributes:
         food (int): number of food to spawn each epoch
+        food_coords (List): (F, 2) array of food coordinates of each epoch
+        epoch_buffers (EpochBuffers): random draw buffers reused each epoch
+        rng (np.random.Generator): generator food is placed with, None if
+            not seeded
+        key (int): key of counter-based epoch draws, None if not seeded
     """
 
-    def __init__(self, food: int) -> None:
-        """See parent docstring"""
+    def __init__(self, food: int, seed: int = None) -> None:
+        """
+        Inits EnvironmentWithFood
+
+        Args:
+            food (int): number of food to spawn each epoch
+            seed (int): seeds food placement, offspring positions and the
+                draws blobs move, eat and reproduce by, so that seeded runs
+                starting from the same population are reproducible. Blobs
+                whose class overrides reproduce or move still draw from
+                random. If None, all draws come from the shared generators,
+                which helpers.seed seeds
+        """
         super().__init__()
         self.food: int = food
-        self.food_coords = [
-            [(random.random(), random.random()) for f in range(self.food)]
-        ]
+        self.epoch_buffers = EpochBuffers()
+        # Unseeded environments keep no generator of their own. They look up
+        # the shared RNG when drawing, so copies sent to other processes draw
+        # from that process's RNG rather than replaying the same state
+        self.rng = None
+        self.key = None
+        if seed is not None:
+            seeds = np.random.SeedSequence(seed)
+            self.rng = np.random.default_rng(seeds)
+            # squares32 wants a key with an irregular bit pattern
+            self.key = int(seeds.generate_state(1, np.uint64)[0]) | 1
+        self.food_coords: List = []
+        self.spawn_food()
 
     def spawn_food(self):
         """Spawn food at randomly distributed coordinates"""
-        gen_food_coords = []
-        for f in range(self.food):
-            f_coord = (random.random(), random.random())
-            gen_food_coords.append(f_coord)
-        self.food_coords.append(gen_food_coords)
+        rng = RNG if self.rng is None else self.rng
+        self.food_coords.append(rng.random((self.food, 2)))
+
+    def prepare_draws(self, n: int) -> EpochDraws:
+        """
+        Draws all random numbers needed by n blobs in the current epoch. See
+        EpochBuffers.prepare. Seeded environments draw from counters keyed
+        by the environment and the index of the current generation
+
+        Args:
+            n (int): number of blobs
+        Returns:
+            (EpochDraws)
+        """
+        return self.epoch_buffers.prepare(
+            n, self.key, len(self.population) - 1
+        )
+
+    def place_offspring(self, new_blobs: List) -> None:
+        """
+        Places offspring of seeded environments at positions drawn by rng.
+        Offspring of unseeded environments keep the positions drawn by
+        random when they were created
+
+        Args:
+            new_blobs (List): offspring to place
+        """
+        if self.rng is None:
+            return
+        spawn_xy = self.rng.random((len(new_blobs), 2)).tolist()
+        for b, (x, y) in zip(new_blobs, spawn_xy):
+            b.x, b.y = x, y
+
+    def find_closest_food(self) -> np.ndarray:
+        """
+        Finds the food closest to each blob in most recent generation, for
+        all blobs at once
+
+        Returns:
+            (np.ndarray): index into food_coords[-1] of closest food for
+                each blob
+        """
+        table = self.tables[-1]
+        closest_idx, _ = find_closest_coords(
+            table.x, table.y, self.food_coords[-1]
+        )
+        return closest_idx
+
+    def move_towards_closest_food(self) -> np.ndarray:
+        """
+        Moves all blobs in most recent generation towards the food closest to
+        them. Movement is applied to the whole generation at once
+
+        Returns:
+            (np.ndarray): index into food_coords[-1] of closest food for
+                each blob
+        """
+        closest_idx = self.find_closest_food()
+        pop = BlobPopulation.from_blobs(self.population[-1])
+        pop.move_all(
+            self.food_coords[-1][closest_idx],
+            self.prepare_draws(len(pop)),
+        )
+        pop.write_back()
+        return closest_idx
 
     def interact(self):
         """
         Spawns food, then blobs move towards food. Those who eat food
         survive, those who don't roll the dice for survival
         """
+        self.refresh_table()
         self.spawn_food()
+        current_gen = self.population[-1]
+        closest_food = self.food_coords[-1][self.find_closest_food()]
+
+        # Moving, eating or rolling dice for survival, and rolling dice for
+        # reproduction and mutation all happen in one pass over the arrays
+        pop = BlobPopulation.from_blobs(current_gen)
+        survives, reproduces, mutates = pop.epoch_step(
+            closest_food, self.prepare_draws(len(pop))
+        )
+        pop.write_back()
 
-        # Determine what blobs survive based off ability to reach food
-        survived = []
-        for b in self.population[-1]:
-            closest_food, dist = find_closest_coord(
-                (b.x, b.y), self.food_coords[-1]
-            )
-            b.move(closest_food)
-            new_dist = calculate_distance_to_coord((b.x, b.y), closest_food)
-            try_to_eat(b, new_dist, survived)
-
-        # Surviving population rolls dice to reproduce
-        repr_attrs = get_generation_attributes(survived, "reproduction_prob")
-        repr_pop, repr_mask = apply_mask_to_population(survived, repr_attrs)
-
-        new_blobs = [b.reproduce() for b in repr_pop]
+        survived = current_gen[survives]
+        new_blobs = reproduce_all(
+            current_gen[reproduces], mutates=mutates[reproduces]
+        )
+        self.place_offspring(new_blobs)
 
         # Save instances that survived and new instances, add to population
-        self.population.append(merge_populations(survived, new_blobs))
+        self.append_generation(merge_populations(survived, new_blobs))
 
     def show_one_generation(self, generation_idx: int) -> None:
         """
@@ -225,8 +392,8 @@ class EnvironmentWithFood(BaseEnvironment):
         # Plot location of food
         gen_food = self.food_coords[generation_idx]
         ax.scatter(
-            [f[0] * self.dimension for f in gen_food],
-            [f[1] * self.dimension for f in gen_food],
+            gen_food[:, 0] * self.dimension,
+            gen_food[:, 1] * self.dimension,
             color="orange",
             s=FOOD_DISPLAY_SIZE,
             label="Food",
@@ -234,20 +401,7 @@ class EnvironmentWithFood(BaseEnvironment):
 
         # Plot location of blobs. Note that this is functionally equivalent
         # to the BaseBlob implementation
-        current_gen = self.population[generation_idx]
-        types = list(set([b.name for b in current_gen]))
-        for idx, t in enumerate(types):
-            t_idx = [
-                i for i in range(len(current_gen)) if current_gen[i].name == t
-            ]
-            t_population = [current_gen[i] for i in t_idx]
-            ax.scatter(
-                x=[s.x * self.dimension for s in t_population],
-                y=[s.y * self.dimension for s in t_population],
-                color=t_population[0].color,
-                s=BLOB_DISPLAY_SIZE,
-                label=f"{types[idx]} - {len(t_population)}",
-            )
+        self.scatter_generation(ax, generation_idx)
 
         plt.title(
             f"Generation {generation_idx}:{len(self.population[generation_idx])} blobs"
@@ -270,9 +424,9 @@ class InteractiveEnvironment(EnvironmentWithFood):
         food (int): number of food to spawn each epoch
     """
 
-    def __init__(self, food: int) -> None:
+    def __init__(self, food: int, seed: int = None) -> None:
         """See parent docstring"""
-        super().__init__(food)
+        super().__init__(food, seed)
         self.food = food
 
     def interact(self) -> None:
@@ -280,52 +434,156 @@ class InteractiveEnvironment(EnvironmentWithFood):
         Spawns food, then blobs move towards food. QuickBlobs eat first, then
         rest of blobs interact to decide who eats
         """
+        self.refresh_table()
         self.spawn_food()
-
-        survived = []
-        remaining_food = self.food_coords[-1]
-        eaten_food = []
-        for b in self.population[-1]:
-            closest_food, dist = find_closest_coord(
-                (b.x, b.y), self.food_coords[-1]
-            )
-            # All blobs move towards food simultaneously
-            b.move(closest_food)
-            # QuickBlobs eat first
-            if b.name == "QuickBlob":
-                new_dist = calculate_distance_to_coord(
-                    (b.x, b.y), closest_food
-                )
-                successfully_ate = try_to_eat(b, new_dist, survived)
-                if successfully_ate:
-                    eaten_food.append(closest_food)
+        # All blobs move towards food simultaneously
+        closest_idx = self.move_towards_closest_food()
+
+        food = self.food_coords[-1]
+        uneaten = np.ones(len(food), dtype=bool)
+        # QuickBlobs eat first
+        is_quick = np.array(
+            [b.name == "QuickBlob" for b in self.population[-1]], dtype=bool
+        )
+        quick_blobs = self.population[-1][is_quick]
+        quick_food = closest_idx[is_quick]
+        quick_dists = calculate_distances_to_coords(
+            get_generation_attributes(quick_blobs, "x"),
+            get_generation_attributes(quick_blobs, "y"),
+            food[quick_food],
+        )
+        quick_sizes = get_generation_attributes(quick_blobs, "size")
+        quick_fed = eat_and_survive(
+            quick_dists,
+            quick_sizes,
+            get_generation_attributes(quick_blobs, "survival_prob"),
+            self.rng,
+        )
+        uneaten[quick_food[quick_dists <= quick_sizes]] = False
+        survived = list(quick_blobs[quick_fed])
 
         # Remove food that's already been eaten by QuickBlobs
-        for f in set(eaten_food):
-            if f in remaining_food:
-                remaining_food.remove(f)
-
-        # Now rest of blobs interact
-        for b in self.population[-1]:
+        remaining_food = food[uneaten]
+        self.food_coords[-1] = remaining_food
+
+        # Now rest of blobs interact. Attacks from all AttackingBlobs land at
+        # once, before anyone eats, and all TimidBlobs run from the closest
+        # AttackingBlob at once
+        current_gen = self.population[-1]
+        pop = BlobPopulation.from_blobs(current_gen)
+        contenders, contender_idx = [], []
+        chaser_idx, attacker_idx, timid_idx, other_idx = [], [], [], []
+        for i, b in enumerate(current_gen):
             if b.name != "QuickBlob":
-                closest_food, dist = find_closest_coord(
-                    (b.x, b.y), remaining_food
-                )
-                nearby_blobs = find_blobs_in_reach(b, self.population[-1])
-                try:
-                    b.interact_with_surroundings(nearby_blobs)
-                except AttributeError:
-                    # Blobs not inheriting from BaseInteractingBlob will not
-                    # contain this method, so no interaction from them
-                    pass
-                # If blob is sufficiently weakened from attack, can't eat even
-                # if within range
-                if b.survival_prob > 0:
-                    try_to_eat(b, dist, survived)
+                contenders.append(b)
+                contender_idx.append(i)
+                interact = getattr(type(b), "interact_with_surroundings", None)
+                if isinstance(b, AttackingBlob):
+                    chaser_idx.append(i)
+                # Like reproduce_all, classes overriding how they interact
+                # keep calling their own method instead of the array updates
+                if interact is AttackingBlob.interact_with_surroundings:
+                    attacker_idx.append(i)
+                elif (
+                    interact is TimidBlob.interact_with_surroundings
+                    and type(b).run_away is TimidBlob.run_away
+                ):
+                    timid_idx.append(i)
+                else:
+                    other_idx.append(i)
+        attacker_idx = np.array(attacker_idx, dtype=np.intp)
+        chaser_idx = np.array(chaser_idx, dtype=np.intp)
+        timid_idx = np.array(timid_idx, dtype=np.intp)
+
+        # Distance to remaining food is measured from where blobs moved to,
+        # for all contenders at once
+        contender_idx = np.array(contender_idx, dtype=np.intp)
+        _, dists = find_closest_coords(
+            pop.xs[contender_idx], pop.ys[contender_idx], remaining_food
+        )
+
+        # Find blobs in reach of all attackers and other interacting blobs
+        # with a single grid query. Attackers come first in the query
+        offsets, neighbors = pop.find_in_reach(
+            np.concatenate((attacker_idx, other_idx)).astype(np.intp)
+        )
+        n_attackers = len(attacker_idx)
+        attack_dmg = np.repeat(
+            [current_gen[i].attack_dmg for i in attacker_idx],
+            np.diff(offsets[: n_attackers + 1]),
+        )
+        pop.apply_attacks(neighbors[: offsets[n_attackers]], attack_dmg)
+        pop.run_from_closest(timid_idx, chaser_idx)
+        pop.write_back()
+
+        for k, i in enumerate(other_idx, start=n_attackers):
+            nearby_blobs = list(
+                current_gen[neighbors[offsets[k] : offsets[k + 1]]]
+            )
+            try:
+                current_gen[i].interact_with_surroundings(nearby_blobs)
+            except AttributeError:
+                # Blobs not inheriting from BaseInteractingBlob will not
+                # contain this method, so no interaction from them
+                pass
+
+        # If blob is sufficiently weakened from attack, can't eat even if
+        # within range
+        survival_probs = get_generation_attributes(contenders, "survival_prob")
+        sizes = get_generation_attributes(contenders, "size")
+        fed = eat_and_survive(dists, sizes, survival_probs, self.rng)
+        fed &= survival_probs > 0
+        survived.extend(b for b, f in zip(contenders, fed.tolist()) if f)
 
         # Surviving population rolls dice to reproduce
         repr_attrs = get_generation_attributes(survived, "reproduction_prob")
-        repr_pop, repr_mask = apply_mask_to_population(survived, repr_attrs)
+        repr_pop, repr_mask = apply_mask_to_population(
+            survived, repr_attrs, self.rng, self.event_buffer(len(survived))
+        )
+
+        mut = None if self.rng is None else self.rng.random(len(repr_pop))
+        new_blobs = reproduce_all(repr_pop, mut=mut)
+        self.place_offspring(new_blobs)
+        self.append_generation(merge_populations(survived, new_blobs))
+
+
+def _evolve_one(env: BaseEnvironment, n_gens: int) -> BaseEnvironment:
+    """
+    Runs interact n_gens times on a single environment
 
-        new_blobs = [b.reproduce() for b in repr_pop]
-        self.population.append(merge_populations(survived, new_blobs))
+    Args:
+        env (BaseEnvironment): environment to evolve
+        n_gens (int): number of generations to evolve
+    Returns:
+        (BaseEnvironment): evolved environment
+    """
+    for i in range(n_gens):
+        env.interact()
+    return env
+
+
+def evolve_many(
+    envs: List[BaseEnvironment], n_gens: int, max_workers: int = None
+) -> List[BaseEnvironment]:
+    """
+    Evolves independent environments in parallel, one process per core.
+    Useful for parameter sweeps, where every environment runs its own
+    simulation with no shared state. Workers are spawned rather than forked,
+    since forking after numba has compiled its kernels can deadlock, so each
+    worker also seeds its own random state. Unseeded environments draw from
+    their worker's state, seeded ones from their own generators. Blob
+    classes must be importable by workers, i.e. defined in a module rather
+    than in a notebook
+
+    Args:
+        envs (List[BaseEnvironment]): environments to evolve
+        n_gens (int): number of generations to evolve each environment
+        max_workers (int): maximum number of worker processes. If None,
+            one per core
+    Returns:
+        (List[BaseEnvironment]): evolved copies of envs, in the same order
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp.get_context("spawn")
+    ) as ex:
+        return list(ex.map(_evolve_one, envs, [n_gens] * len(envs)))
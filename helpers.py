@@ -2,10 +2,30 @@
 this project obeys the convention that functions that modify an objects
 internal state wil be kept as class methods and the rest here"""
 from typing import Union, List, Callable
-from copy import deepcopy
+from copy import copy, deepcopy
+from operator import attrgetter
+import math
 import random
 import numpy as np
 
+# Generator shared by every module for bulk draws. Modules bind it with
+# `from helpers import RNG`, so it is reseeded in place by seed rather than
+# reassigned
+RNG = np.random.default_rng()
+
+
+def seed(n: int) -> None:
+    """
+    Seeds the shared generators, i.e. RNG and the random module that blobs
+    draw from, so that simulations run in this process are reproducible.
+    RNG's state is reset in place, so every module bound to it is seeded
+
+    Args:
+        n (int): seed
+    """
+    random.seed(n)
+    RNG.bit_generator.state = np.random.default_rng(n).bit_generator.state
+
 
 def get_pivot_indices(population: List) -> tuple:
     """
@@ -25,7 +45,10 @@ def get_pivot_indices(population: List) -> tuple:
 
 
 def apply_mask_to_population(
-    population: Union[List, np.ndarray], attributes: np.ndarray
+    population: Union[List, np.ndarray],
+    attributes: np.ndarray,
+    rng: np.random.Generator = None,
+    out: np.ndarray = None,
 ) -> tuple:
     """
     Applies mask to population based off randomly generated array vs
@@ -34,13 +57,26 @@ def apply_mask_to_population(
     Args:
         population Union(List, np.ndarray): population to mask
         attributes (np.ndarray): attributes of population
+        rng (np.random.Generator): generator to draw events from. If None,
+            RNG
+        out (np.ndarray): float64 array of one entry per blob to draw events
+            into, e.g. from BaseEnvironment.event_buffer. If None, a new
+            array is allocated
     Returns:
         Tuple: masked population and mask
     """
-    if isinstance(population, List):
+    if isinstance(population, list):
         population = np.array(population)
 
-    event_prob = np.random.uniform(low=0.1, high=1.0, size=population.shape)
+    # Events are drawn from [0.1, 1.0), so attributes below 0.1 never pass
+    if rng is None:
+        rng = RNG
+    if out is None:
+        event_prob = rng.random(population.shape[0])
+    else:
+        event_prob = rng.random(out=out)
+    event_prob *= 0.9
+    event_prob += 0.1
     mask = event_prob <= attributes
     return (population[mask], mask)
 
@@ -51,8 +87,7 @@ def get_generation_attributes(population: List, attribute: str) -> np.ndarray:
 
     Args:
         population (List): population to get attributes for
-        attribute (str): name of attribute to get. Attribute must be a class
-            variable for Blob type
+        attribute (str): name of attribute of Blob to get
     returns:
         np.ndarray: attributes of population
     """
@@ -60,22 +95,9 @@ def get_generation_attributes(population: List, attribute: str) -> np.ndarray:
         # If population is empty, all blobs are dead and thus no attrs to return
         return np.array([])
 
-    # Get indexes of pivot points in population
-    names, pivots = get_pivot_indices(population)
-
-    attr_values = []
-    # For each blob type, save attributes in lists
-    for i, idx in np.ndenumerate(pivots):
-        if i[0] == 0:
-            attr_values.extend(
-                [getattr(population[idx], attribute)] * (idx + 1)
-            )
-        else:
-            attr_values.extend(
-                [getattr(population[idx], attribute)]
-                * (idx - pivots[i[0] - 1])
-            )
-    return np.array(attr_values)
+    # attrgetter reads the attribute in C rather than through a generator.
+    # dtype is inferred so that non-numeric attributes such as name work too
+    return np.array(list(map(attrgetter(attribute), population)))
 
 
 def get_population_at_each_generation(population: np.ndarray) -> tuple:
@@ -89,65 +111,25 @@ def get_population_at_each_generation(population: np.ndarray) -> tuple:
         Tuple: Dicts with count of each type across generations and color map
             mapping each blob type to a color
     """
-    # Get all blob instances across all generations and note unique
-    # instances
-    all_blobs = list(np.concatenate(np.array(population, dtype=object)))
-    all_blobs.sort(key=lambda x: x.name)
-    all_blob_types = set([x.name for x in all_blobs])
-    type_dict = {t: [] for t in all_blob_types}
-    color_maps = {t: None for t in all_blob_types}
-
-    # Iterate through generations and count each type of blob
-    for g, gen in enumerate(population):
-        if len(gen) == 0:
-            # If generation has died off, append 0 to all counters
-            for t in type_dict:
-                type_dict[t].append(0)
-            continue
-
-        type_tracker = list(all_blob_types)
-        # If only one type of blob, don't iterate through everything and just
-        # use attrs of that single blob
-        if len(type_tracker) == 1:
-            rep_blob = type_tracker[0]
-            if len(gen) == 0:
-                # If entire generation is dead, don't save color attr since
-                # won't be displayed
-                type_dict[rep_blob].append(0)
-            else:
-                type_dict[rep_blob].append(len(gen))
-                color_maps[rep_blob] = gen[0].color
-        else:
-            names, pivots = get_pivot_indices(gen)
-            # Since population is sorted, instead of iterating through each
-            # instance and noting the type, only note indices corresponding
-            # to type changes and infer the types from the changes
-
-            for i, idx in np.ndenumerate(pivots):
-                # Get index of first blob of type
-                # first_blob_idx = idx - 1
-                # if idx == 0:
-                # first_blob_idx = idx
-                first_blob_idx = idx
-
-                type_blob = gen[first_blob_idx].name
-                color_maps[type_blob] = gen[first_blob_idx].color
-
-                if i[0] == 0:
-                    count = idx + 1
-                else:
-                    count = idx - pivots[i[0] - 1]
-
-                type_dict[type_blob].append(count)
-                if type_blob in type_tracker:
-                    type_tracker.remove(type_blob)
-
-            if type_tracker:
-                # If blob type absent in generation but present in other
-                # generations
-                for t in type_tracker:
-                    type_dict[t].append(0)
-
+    # Count each type of blob in each generation, noting the color of each
+    # type the first time it shows up
+    gen_counts = []
+    color_maps = {}
+    for gen in population:
+        names = np.array([b.name for b in gen], dtype=str)
+        types, first_idx, counts = np.unique(
+            names, return_index=True, return_counts=True
+        )
+        for t, idx in zip(types.tolist(), first_idx.tolist()):
+            if t not in color_maps:
+                color_maps[t] = gen[idx].color
+        gen_counts.append(dict(zip(types.tolist(), counts.tolist())))
+
+    # Types absent from a generation, including dead generations, count 0
+    type_dict = {
+        t: [counts.get(t, 0) for counts in gen_counts]
+        for t in sorted(color_maps)
+    }
     return (type_dict, color_maps)
 
 
@@ -163,13 +145,14 @@ def merge_populations(
     Returns:
         (np.ndarray)
     """
-    if not isinstance(pop1, np.ndarray):
-        pop1 = np.array(pop1)
-    if not isinstance(pop2, np.ndarray):
-        pop2 = np.array(pop2)
-    merged = list(np.append(pop1, pop2))
-    merged.sort(key=lambda x: x.name)
-    return np.array(merged)
+    # Fill one preallocated array and sort it with a single stable argsort
+    # on names, rather than appending, boxing into a list and re-sorting
+    n1 = len(pop1)
+    merged = np.empty(n1 + len(pop2), dtype=object)
+    merged[:n1] = pop1
+    merged[n1:] = pop2
+    names = np.array([b.name for b in merged], dtype=str)
+    return merged[np.argsort(names, kind="stable")]
 
 
 def find_closest_coord(blob_coords: tuple, coord_list: List) -> tuple:
@@ -178,19 +161,31 @@ def find_closest_coord(blob_coords: tuple, coord_list: List) -> tuple:
 
     Args:
         blob_coords (tuple): coordinates of blob to base distance off
-        coord_list (List): List of all coordinates to compare against
+        coord_list (List): List of all coordinates to compare against, or
+            an (N, 2) array of them
     Returns:
         (tuple)
     """
-    min_dist = 1000000
-    closest_coord = None
-
-    for coord in coord_list:
-        dist = calculate_distance_to_coord(blob_coords, coord)
-        if dist < min_dist:
-            closest_coord = coord
-            min_dist = dist
-    return closest_coord, min_dist
+    if len(coord_list) == 0:
+        return None, math.inf
+
+    # Converting a list to an array costs more than scanning it in Python,
+    # so only coordinates already held in an array are searched with NumPy
+    if not isinstance(coord_list, np.ndarray):
+        closest = min(
+            coord_list,
+            key=lambda c: calculate_sq_distance_to_coord(blob_coords, c),
+        )
+        return closest, calculate_distance_to_coord(blob_coords, closest)
+
+    # Compare squared distances of all coordinates at once and only take
+    # the root of the closest
+    coord_arr = np.asarray(coord_list, dtype=np.float64).reshape(-1, 2)
+    dx = coord_arr[:, 0] - blob_coords[0]
+    dy = coord_arr[:, 1] - blob_coords[1]
+    dist_sq = dx * dx + dy * dy
+    i = dist_sq.argmin()
+    return coord_list[i], math.sqrt(dist_sq[i])
 
 
 def calculate_distance_to_coord(blob_coord: tuple, coord: tuple) -> float:
@@ -203,9 +198,41 @@ def calculate_distance_to_coord(blob_coord: tuple, coord: tuple) -> float:
     Returns:
         (float): distance to coordinate
     """
-    return (
-        (coord[0] - blob_coord[0]) ** 2 + (coord[1] - blob_coord[1]) ** 2
-    ) ** (1 / 2)
+    return math.sqrt(calculate_sq_distance_to_coord(blob_coord, coord))
+
+
+def calculate_distances_to_coords(
+    xs: np.ndarray, ys: np.ndarray, coords: np.ndarray
+) -> np.ndarray:
+    """
+    Calculates distance from each blob to its own coordinate, like
+    calculate_distance_to_coord for many blobs at once
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs
+        ys (np.ndarray): y-coordinates of blobs
+        coords (np.ndarray): (N, 2) array with a coordinate for each blob
+    Returns:
+        (np.ndarray): distance of each blob to its coordinate
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    return np.hypot(coords[:, 0] - xs, coords[:, 1] - ys)
+
+
+def calculate_sq_distance_to_coord(blob_coord: tuple, coord: tuple) -> float:
+    """
+    Calculates squared distance from blob to coordinate. Cheaper than
+    calculate_distance_to_coord when only comparing distances
+
+    Args:
+        blob_coords (tuple): coordinates of blob in (x, y)
+        coord (tuple): coordinate in (x,y)
+    Returns:
+        (float): squared distance to coordinate
+    """
+    dx = coord[0] - blob_coord[0]
+    dy = coord[1] - blob_coord[1]
+    return dx * dx + dy * dy
 
 
 def determine_number_survivors_of_type(
@@ -221,11 +248,10 @@ def determine_number_survivors_of_type(
     Returns:
         (int) - number of survivors of blob_type. 0 indicates extinction
     """
-    # Only examine last generation to save from iterating through all
-    names, _ = get_pivot_indices(population[-1])
-    if names.shape == (0,):
-        return 0
-    return (names == blob_type).sum()
+    # Only examine last generation to save from iterating through all. The
+    # count needs no pivots, and callers may pass generations that aren't
+    # sorted by name, so blobs are counted directly
+    return sum(b.name == blob_type for b in population[-1])
 
 
 def find_blobs_in_reach(blob, blob_list: List) -> List:
@@ -238,21 +264,21 @@ def find_blobs_in_reach(blob, blob_list: List) -> List:
     Returns:
         (List)
     """
-    closest_blobs = []
-    for b in blob_list:
-        # Check that blob is not identical to comparison blob
-        if (blob.x, blob.y) != (b.x, b.y):
-            dist = calculate_distance_to_coord((blob.x, blob.y), (b.x, b.y))
-            if dist <= blob.size:
-                closest_blobs.append(b)
-    return closest_blobs
+    xs = get_generation_attributes(blob_list, "x")
+    ys = get_generation_attributes(blob_list, "y")
+    dx = xs - blob.x
+    dy = ys - blob.y
+    in_reach = dx * dx + dy * dy <= blob.size * blob.size
+    # Blobs at the exact same position as blob are not in reach
+    in_reach &= (dx != 0) | (dy != 0)
+    return [blob_list[i] for i in np.flatnonzero(in_reach)]
 
 
 def try_to_eat(blob, dist_to_food: float, survived_list: List) -> bool:
     """
     Function for deciding whether a blob eats or not. If blob within reach of
     food, will eat and survive epoch. If not, roll dice to decide if survive
-    or not
+    or not. Use eat_and_survive to decide for many blobs at once
 
     Args:
         blob (Blob)
@@ -270,6 +296,50 @@ def try_to_eat(blob, dist_to_food: float, survived_list: List) -> bool:
             survived_list.append(blob)
     return False
 
+def eat_and_survive(
+    dists: np.ndarray,
+    sizes: np.ndarray,
+    survival_probs: np.ndarray,
+    rng: np.random.Generator = None,
+) -> np.ndarray:
+    """
+    Decides which blobs survive the epoch, like try_to_eat for a whole
+    population at once. Blobs within reach of food eat and survive, the
+    rest roll dice against their survival_prob
+
+    Args:
+        dists (np.ndarray): distance of each blob to its closest food
+        sizes (np.ndarray): size of each blob
+        survival_probs (np.ndarray): survival_prob of each blob
+        rng (np.random.Generator): generator to roll dice with. If None,
+            RNG
+    Returns:
+        (np.ndarray): bool mask of blobs that survive
+    """
+    if rng is None:
+        rng = RNG
+    survives = rng.random(len(dists)) < survival_probs
+    survives |= dists <= sizes
+    return survives
+
+
+def copy_blob(blob):
+    """
+    Copies blob independently of the original. Slotted attributes of blobs
+    are scalars, so a shallow copy suffices unless blob also holds
+    attributes of its own in __dict__, which may be mutable and are deep
+    copied
+
+    Args:
+        blob (Blob)
+    Returns:
+        (Blob): copy of blob
+    """
+    if getattr(blob, "__dict__", None):
+        return deepcopy(blob)
+    return copy(blob)
+
+
 def set_attrs_of_population(population_list: Union[List, np.ndarray],
         s: float = None,
         r: float = None,
@@ -294,14 +364,15 @@ def set_attrs_of_population(population_list: Union[List, np.ndarray],
 
     copied_pop = []
     for b in population_list:
-        b = deepcopy(b)
-        if s is None:
-            s = b.survival_prob
-        if r is None:
-            r = b.reproduction_prob
-        if m is None:
-            m = b.mutation_prob
-        b.set_probs(s, r, m)
+        # Only attributes that are set are written, the rest keep each
+        # blob's own value
+        b = copy_blob(b)
+        if s is not None:
+            b.survival_prob = s
+        if r is not None:
+            b.reproduction_prob = r
+        if m is not None:
+            b.mutation_prob = m
         copied_pop.append(b)
     return copied_pop
 
@@ -326,30 +397,28 @@ def set_classes_of_population(population_list: Union[List, np.ndarray],
 
     copied_pop = []
     for b in population_list:
-        b = deepcopy(b)
-        if repr_class is None:
-            repr_class = b.repr_class
-        if mutation_class is None:
-            mutation_class = b.mutation_class
-        b.repr_class = repr_class
-        b.mutation_class = mutation_class
+        b = copy_blob(b)
+        if repr_class is not None:
+            b.repr_class = repr_class
+        if mutation_class is not None:
+            b.mutation_class = mutation_class
         copied_pop.append(b)
     return copied_pop
 
 def determine_most_prevalent_blob(population_list: Union[List, np.ndarray]) -> str:
     """
-    Determines which blob type in `population_list` is at highest count
+    Determines which blob type in `population_list` is at highest count.
+    Ties go to the alphabetically first name
 
     Args:
         population_list (Union[List, np.ndarray])
     Returns:
         (str): name of most prevalent blob class
     """
-    counts, _ = get_population_at_each_generation(population_list)
-    min_blob = 0
-    highest_count_blob = None
-    for t in counts:
-        if counts[t][-1] > min_blob:
-            min_blob = counts[t][-1]
-            highest_count_blob = t
-    return highest_count_blob
+    # Only the last generation counts, so group its names in a single pass
+    # rather than counting every generation
+    names = np.array([b.name for b in population_list[-1]], dtype=str)
+    if len(names) == 0:
+        return None
+    types, counts = np.unique(names, return_counts=True)
+    return str(types[counts.argmax()])
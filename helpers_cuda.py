@@ -0,0 +1,118 @@
+"""Repository of CUDA kernels for updating very large populations on the
+GPU. Requires numba and a CUDA capable device; when either is missing
+CUDA_AVAILABLE is False and callers stay on the CPU"""
+import math
+
+try:
+    from numba import cuda
+
+    CUDA_AVAILABLE = cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+THREADS_PER_BLOCK = 256
+
+if CUDA_AVAILABLE:
+
+    @cuda.jit
+    def _move_random_kernel(xs, ys, steps, kind, target_kind, dir_x, dir_y):
+        """Moves blobs of target_kind in a random direction. Directions are
+        drawn on the host so results match the CPU path"""
+        i = cuda.grid(1)
+        if i < xs.size and kind[i] == target_kind:
+            xs[i] += math.copysign(steps[i], 2 * dir_x[i] - 1)
+            ys[i] += math.copysign(steps[i], 2 * dir_y[i] - 1)
+
+    @cuda.jit
+    def _move_towards_kernel(xs, ys, steps, kind, target_kind, coords):
+        """Moves blobs of target_kind towards their coordinate"""
+        i = cuda.grid(1)
+        if i < xs.size and kind[i] == target_kind:
+            xs[i] += math.copysign(steps[i], coords[i, 0] - xs[i])
+            ys[i] += math.copysign(steps[i], coords[i, 1] - ys[i])
+
+    @cuda.jit
+    def _apply_attacks_kernel(survival_prob, target_indices, attack_dmg):
+        """Subtracts each attack's damage from its target. Atomic so that
+        blobs attacked more than once take damage from every attack"""
+        k = cuda.grid(1)
+        if k < target_indices.size:
+            cuda.atomic.sub(survival_prob, target_indices[k], attack_dmg[k])
+
+
+def _blocks(n: int) -> int:
+    """Number of blocks needed to give each of n items its own thread"""
+    return (n + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+
+
+def move_all_cuda(
+    xs,
+    ys,
+    steps,
+    kind,
+    coords,
+    dir_x,
+    dir_y,
+    random_kind: int,
+    towards_kind: int,
+) -> None:
+    """
+    Moves random movers and blobs moving towards a coordinate on the GPU.
+    Arrays are copied to the device once, both kernels run on the device
+    copies and positions are copied back into xs and ys
+
+    Args:
+        xs (np.ndarray): float32 x-coordinates of blobs, updated in place
+        ys (np.ndarray): float32 y-coordinates of blobs, updated in place
+        steps (np.ndarray): float32 step of blobs
+        kind (np.ndarray): int8 movement kind of blobs
+        coords (np.ndarray): (N, 2) float32 coordinates to move towards
+        dir_x (np.ndarray): direction bits (0 or 1) for movement along x
+        dir_y (np.ndarray): direction bits (0 or 1) for movement along y
+        random_kind (int): movement kind of random movers
+        towards_kind (int): movement kind of blobs moving towards coords
+    """
+    blocks = _blocks(xs.shape[0])
+    d_xs = cuda.to_device(xs)
+    d_ys = cuda.to_device(ys)
+    d_steps = cuda.to_device(steps)
+    d_kind = cuda.to_device(kind)
+
+    _move_random_kernel[blocks, THREADS_PER_BLOCK](
+        d_xs,
+        d_ys,
+        d_steps,
+        d_kind,
+        random_kind,
+        cuda.to_device(dir_x),
+        cuda.to_device(dir_y),
+    )
+    _move_towards_kernel[blocks, THREADS_PER_BLOCK](
+        d_xs, d_ys, d_steps, d_kind, towards_kind, cuda.to_device(coords)
+    )
+    d_xs.copy_to_host(xs)
+    d_ys.copy_to_host(ys)
+
+
+def apply_attacks_cuda(survival_prob, target_indices, attack_dmg) -> None:
+    """
+    Damages survival_prob of attacked blobs on the GPU, one thread per
+    attack
+
+    Args:
+        survival_prob (np.ndarray): float64 survival_prob of blobs, updated
+            in place
+        target_indices (np.ndarray): indices of attacked blobs, one entry
+            per attack
+        attack_dmg (np.ndarray): float64 damage dealt by each attack
+    """
+    if target_indices.shape[0] == 0:
+        return
+    blocks = _blocks(target_indices.shape[0])
+    d_survival_prob = cuda.to_device(survival_prob)
+    _apply_attacks_kernel[blocks, THREADS_PER_BLOCK](
+        d_survival_prob,
+        cuda.to_device(target_indices),
+        cuda.to_device(attack_dmg),
+    )
+    d_survival_prob.copy_to_host(survival_prob)
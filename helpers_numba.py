@@ -0,0 +1,293 @@
+"""Repository of numba-compiled kernels operating on struct-of-arrays
+populations. numba is an optional dependency; when it is not installed
+NUMBA_AVAILABLE is False and callers use their NumPy implementations"""
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves functions uncompiled"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Offsets of each kind of draw within a blob's block of counters
+DRAW_DIR_X = 0
+DRAW_DIR_Y = 1
+DRAW_SURV = 2
+DRAW_REP = 3
+DRAW_MUT = 4
+N_DRAWS = 5
+
+
+@njit(cache=True)
+def squares32(ctr, key):
+    """
+    Squares counter-based random number generator (Widynski). Every
+    (ctr, key) pair maps to its own 32 random bits without any generator
+    state, so draws can be computed independently on every thread. Written
+    with elementwise operations only, so it also works on uint64 arrays when
+    numba is not installed
+
+    Args:
+        ctr (np.uint64): counter
+        key (np.uint64): key, ideally with an irregular bit pattern
+    Returns:
+        (np.uint64): random value in [0, 2 ** 32)
+    """
+    half = np.uint64(32)
+    x = ctr * key
+    y = x
+    z = y + key
+    x = x * x + y
+    x = (x >> half) | (x << half)
+    x = x * x + z
+    x = (x >> half) | (x << half)
+    x = x * x + y
+    x = (x >> half) | (x << half)
+    return (x * x + z) >> half
+
+
+@njit(parallel=True, cache=True)
+def fill_counter_draws(key, epoch, dir_x, dir_y, surv, rep, mut):
+    """
+    Fills an epoch's draws from squares32. Blob i's draws in an epoch come
+    from its own block of N_DRAWS counters, so they depend only on key,
+    epoch and i
+
+    Args:
+        key (np.uint64): key of the simulation
+        epoch (np.uint64): index of the epoch
+        dir_x (np.ndarray): direction bits for movement along x, filled
+        dir_y (np.ndarray): direction bits for movement along y, filled
+        surv (np.ndarray): uniform draws in [0, 1), filled
+        rep (np.ndarray): uniform draws in [0.1, 1), filled
+        mut (np.ndarray): uniform draws in [0, 1), filled
+    """
+    base = np.uint64(epoch) << np.uint64(32)
+    scale = 1.0 / 4294967296.0
+    for i in prange(dir_x.shape[0]):
+        ctr = base + np.uint64(i * N_DRAWS)
+        dir_x[i] = squares32(ctr + np.uint64(DRAW_DIR_X), key) >> 31
+        dir_y[i] = squares32(ctr + np.uint64(DRAW_DIR_Y), key) >> 31
+        surv[i] = squares32(ctr + np.uint64(DRAW_SURV), key) * scale
+        rep[i] = 0.1 + 0.9 * squares32(ctr + np.uint64(DRAW_REP), key) * scale
+        mut[i] = squares32(ctr + np.uint64(DRAW_MUT), key) * scale
+
+
+@njit(
+    "void(f4[:], f4[:], f4[:], i1[:], i8, i1[:], i1[:])",
+    parallel=True,
+    fastmath=True,
+    cache=True,
+)
+def move_random(xs, ys, steps, kind, target_kind, dir_x, dir_y):
+    """
+    Moves blobs of target_kind in a random direction in increments of step.
+    Randomness is drawn outside the kernel so results match the NumPy path
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs, updated in place
+        ys (np.ndarray): y-coordinates of blobs, updated in place
+        steps (np.ndarray): step of blobs
+        kind (np.ndarray): movement kind of blobs
+        target_kind (int): movement kind to move
+        dir_x (np.ndarray): direction bits (0 or 1) for movement along x
+        dir_y (np.ndarray): direction bits (0 or 1) for movement along y
+    """
+    for i in prange(xs.shape[0]):
+        if kind[i] == target_kind:
+            xs[i] += math.copysign(steps[i], 2 * dir_x[i] - 1)
+            ys[i] += math.copysign(steps[i], 2 * dir_y[i] - 1)
+
+
+@njit(
+    "void(f4[:], f4[:], f4[:], i1[:], i8, f4[:, :])",
+    parallel=True,
+    fastmath=True,
+    cache=True,
+)
+def move_towards(xs, ys, steps, kind, target_kind, coords):
+    """
+    Moves blobs of target_kind towards their coordinate in increments of step
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs, updated in place
+        ys (np.ndarray): y-coordinates of blobs, updated in place
+        steps (np.ndarray): step of blobs
+        kind (np.ndarray): movement kind of blobs
+        target_kind (int): movement kind to move
+        coords (np.ndarray): (N, 2) array of coordinates to move towards
+    """
+    for i in prange(xs.shape[0]):
+        if kind[i] == target_kind:
+            xs[i] += math.copysign(steps[i], coords[i, 0] - xs[i])
+            ys[i] += math.copysign(steps[i], coords[i, 1] - ys[i])
+
+
+@njit(parallel=True, cache=True)
+def scan_in_reach(
+    xs,
+    ys,
+    sizes,
+    queries,
+    order,
+    cell_starts,
+    cells_x,
+    cells_y,
+    grid,
+    fill,
+    offsets,
+    out,
+):
+    """
+    Scans the 3x3 block of grid cells around each queried blob for other
+    blobs within the queried blob's reach. Called twice: first with fill
+    False to count neighbors into offsets[1:], then with fill True to write
+    neighbor indices into out at the cumulative offsets
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs
+        ys (np.ndarray): y-coordinates of blobs
+        sizes (np.ndarray): effective size of blobs
+        queries (np.ndarray): indices of blobs to find neighbors for
+        order (np.ndarray): blob indices sorted by cell id
+        cell_starts (np.ndarray): offset into order of first blob of each
+            cell, with one extra trailing entry
+        cells_x (np.ndarray): grid column of each blob
+        cells_y (np.ndarray): grid row of each blob
+        grid (int): number of cells along each axis
+        fill (bool): False to count neighbors, True to write them
+        offsets (np.ndarray): neighbor counts (fill False) or cumulative
+            offsets into out (fill True)
+        out (np.ndarray): neighbor indices, written when fill is True
+    """
+    for k in prange(queries.shape[0]):
+        i = queries[k]
+        reach = sizes[i] * sizes[i]
+        found = 0
+        for cx in range(max(cells_x[i] - 1, 0), min(cells_x[i] + 2, grid)):
+            for cy in range(max(cells_y[i] - 1, 0), min(cells_y[i] + 2, grid)):
+                c = cx * grid + cy
+                for s in range(cell_starts[c], cell_starts[c + 1]):
+                    j = order[s]
+                    dx = xs[j] - xs[i]
+                    dy = ys[j] - ys[i]
+                    # Blobs at the exact same position are not neighbors
+                    if (dx != 0 or dy != 0) and dx * dx + dy * dy <= reach:
+                        if fill:
+                            out[offsets[k] + found] = j
+                        found += 1
+        if not fill:
+            offsets[k + 1] = found
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def epoch_step(
+    xs,
+    ys,
+    steps,
+    sizes,
+    kind,
+    coords,
+    survival_prob,
+    reproduction_prob,
+    mutation_prob,
+    dir_x,
+    dir_y,
+    surv,
+    rep,
+    mut,
+    random_kind,
+    towards_kind,
+    survives,
+    reproduces,
+    mutates,
+):
+    """
+    Runs a whole epoch of a food environment for every blob in a single pass.
+    Each blob moves, eats if its coordinate is within reach or otherwise
+    rolls for survival, then rolls for reproduction and mutation. Blobs of
+    neither random_kind nor towards_kind are expected to have moved already
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs, updated in place
+        ys (np.ndarray): y-coordinates of blobs, updated in place
+        steps (np.ndarray): step of blobs
+        sizes (np.ndarray): effective size of blobs
+        kind (np.ndarray): movement kind of blobs
+        coords (np.ndarray): (N, 2) array of food coordinates for each blob
+        survival_prob (np.ndarray): survival_prob of blobs
+        reproduction_prob (np.ndarray): reproduction_prob of blobs
+        mutation_prob (np.ndarray): mutation_prob of blobs
+        dir_x (np.ndarray): direction bits (0 or 1) for movement along x
+        dir_y (np.ndarray): direction bits (0 or 1) for movement along y
+        surv (np.ndarray): draws for survival of blobs that don't eat
+        rep (np.ndarray): draws for reproduction events
+        mut (np.ndarray): draws for mutation events
+        random_kind (int): movement kind of random movers
+        towards_kind (int): movement kind of blobs moving towards coords
+        survives (np.ndarray): bool, set for blobs that survive
+        reproduces (np.ndarray): bool, set for survivors that reproduce
+        mutates (np.ndarray): bool, set for offspring that mutate
+    """
+    for i in prange(xs.shape[0]):
+        if kind[i] == random_kind:
+            xs[i] += math.copysign(steps[i], 2 * dir_x[i] - 1)
+            ys[i] += math.copysign(steps[i], 2 * dir_y[i] - 1)
+        elif kind[i] == towards_kind:
+            xs[i] += math.copysign(steps[i], coords[i, 0] - xs[i])
+            ys[i] += math.copysign(steps[i], coords[i, 1] - ys[i])
+
+        dx = coords[i, 0] - xs[i]
+        dy = coords[i, 1] - ys[i]
+        ate = dx * dx + dy * dy <= sizes[i] * sizes[i]
+        survives[i] = ate or surv[i] < survival_prob[i]
+        reproduces[i] = survives[i] and rep[i] <= reproduction_prob[i]
+        mutates[i] = (
+            reproduces[i]
+            and mutation_prob[i] >= 0.01
+            and mut[i] <= mutation_prob[i]
+        )
+
+
+# fastmath without nnan and ninf, so that the inf sentinel is kept
+@njit(
+    "void(f8[:], f8[:], f8[:], f8[:], i8[:], f8[:])",
+    parallel=True,
+    fastmath={"nsz", "arcp", "contract", "afn", "reassoc"},
+    cache=True,
+)
+def nearest_coord(xs, ys, coord_xs, coord_ys, out_idx, out_dist):
+    """
+    Finds the closest coordinate to each blob by scanning every coordinate.
+    Blobs get index -1 and distance inf when there are no coordinates
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs
+        ys (np.ndarray): y-coordinates of blobs
+        coord_xs (np.ndarray): x-coordinates to search
+        coord_ys (np.ndarray): y-coordinates to search
+        out_idx (np.ndarray): index of closest coordinate, written
+        out_dist (np.ndarray): distance to closest coordinate, written
+    """
+    for i in prange(xs.shape[0]):
+        best = np.inf
+        best_idx = -1
+        for j in range(coord_xs.shape[0]):
+            dx = coord_xs[j] - xs[i]
+            dy = coord_ys[j] - ys[i]
+            d = dx * dx + dy * dy
+            if d < best:
+                best = d
+                best_idx = j
+        out_idx[i] = best_idx
+        out_dist[i] = math.sqrt(best)
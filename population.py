@@ -0,0 +1,853 @@
+"""Repository for the struct-of-arrays population container used to update
+an entire generation of blobs at once"""
+from dataclasses import dataclass, fields
+from typing import Dict, List, NamedTuple, Union
+import numpy as np
+from scipy.spatial import cKDTree
+from blobs import BaseBlob, HungryBlob
+from helpers import RNG
+from helpers_cuda import (
+    CUDA_AVAILABLE,
+    apply_attacks_cuda,
+    move_all_cuda,
+)
+from helpers_numba import (
+    DRAW_DIR_X,
+    DRAW_DIR_Y,
+    DRAW_MUT,
+    DRAW_REP,
+    DRAW_SURV,
+    N_DRAWS,
+    NUMBA_AVAILABLE,
+    epoch_step,
+    fill_counter_draws,
+    move_random,
+    move_towards,
+    nearest_coord,
+    scan_in_reach,
+    squares32,
+)
+from settings import CUDA_MIN_POPULATION, KDTREE_MIN_COORDS
+
+
+# Movement kinds. Blobs whose class overrides move with its own behavior are
+# tagged as CUSTOM_MOVER and fall back to calling their scalar move
+CUSTOM_MOVER = -1
+RANDOM_MOVER = 0
+FOOD_SEEKER = 1
+
+
+def get_movement_kind(blob) -> int:
+    """
+    Determines how blob moves based off which move implementation its class
+    uses
+
+    Args:
+        blob (Blob)
+    Returns:
+        (int): one of RANDOM_MOVER, FOOD_SEEKER or CUSTOM_MOVER
+    """
+    move = type(blob).move
+    if move is BaseBlob.move:
+        return RANDOM_MOVER
+    if move is HungryBlob.move:
+        return FOOD_SEEKER
+    return CUSTOM_MOVER
+
+
+class EpochDraws(NamedTuple):
+    """
+    Random numbers drawn up front for every blob in a single epoch
+
+    Attributes:
+        dir_x (np.ndarray): direction bits (0 or 1) for movement along x
+        dir_y (np.ndarray): direction bits (0 or 1) for movement along y
+        surv (np.ndarray): uniform draws in [0, 1) for survival of blobs that
+            don't eat
+        rep (np.ndarray): uniform draws in [0.1, 1) for reproduction events,
+            matching apply_mask_to_population
+        mut (np.ndarray): uniform draws in [0, 1) for mutation events
+    """
+
+    dir_x: np.ndarray
+    dir_y: np.ndarray
+    surv: np.ndarray
+    rep: np.ndarray
+    mut: np.ndarray
+
+
+def empty_draws(n: int) -> EpochDraws:
+    """
+    Allocates uninitialized draw buffers for n blobs
+
+    Args:
+        n (int): number of blobs
+    Returns:
+        (EpochDraws)
+    """
+    return EpochDraws(
+        dir_x=np.empty(n, dtype=np.int8),
+        dir_y=np.empty(n, dtype=np.int8),
+        surv=np.empty(n),
+        rep=np.empty(n),
+        mut=np.empty(n),
+    )
+
+
+def fill_draws(draws: EpochDraws, key: int = None, epoch: int = 0) -> None:
+    """
+    Fills draws in place with all random numbers needed for a single epoch,
+    one call per buffer. If key is given, draws come from the counter-based
+    squares32 generator instead of RNG, so the same key, epoch and blob
+    index always produce the same draws, no matter how many threads
+    compute them
+
+    Args:
+        draws (EpochDraws): buffers to fill
+        key (int): 64-bit key of the simulation for counter-based draws. If
+            None, draws come from RNG
+        epoch (int): index of the epoch for counter-based draws
+    """
+    if key is None:
+        # Direction bits are thresholded from uniform draws so that every
+        # buffer can be filled without allocating
+        for dirs in (draws.dir_x, draws.dir_y):
+            RNG.random(out=draws.surv)
+            np.less(draws.surv, 0.5, out=dirs.view(np.bool_))
+        RNG.random(out=draws.surv)
+        rep = draws.rep
+        RNG.random(out=rep)
+        rep *= 0.9
+        rep += 0.1
+        RNG.random(out=draws.mut)
+        return
+
+    key = np.uint64(key)
+    epoch = np.uint64(epoch)
+    if NUMBA_AVAILABLE:
+        fill_counter_draws(key, epoch, *draws)
+        return
+
+    # Same counters as fill_counter_draws, computed a whole array at a time.
+    # squares32 relies on uint64 arithmetic wrapping around
+    blocks = np.arange(len(draws.mut), dtype=np.uint64) * np.uint64(N_DRAWS)
+    with np.errstate(over="ignore"):
+        ctr = (epoch << np.uint64(32)) + blocks
+        bits = [squares32(ctr + np.uint64(d), key) for d in range(N_DRAWS)]
+    scale = 1.0 / 2 ** 32
+    draws.dir_x[:] = bits[DRAW_DIR_X] >> np.uint64(31)
+    draws.dir_y[:] = bits[DRAW_DIR_Y] >> np.uint64(31)
+    draws.surv[:] = bits[DRAW_SURV] * scale
+    draws.rep[:] = 0.1 + 0.9 * bits[DRAW_REP] * scale
+    draws.mut[:] = bits[DRAW_MUT] * scale
+
+
+def epoch_prepare(n: int, key: int = None, epoch: int = 0) -> EpochDraws:
+    """
+    Draws all random numbers needed by n blobs for a single epoch into
+    freshly allocated buffers. See fill_draws
+
+    Args:
+        n (int): number of blobs
+        key (int): 64-bit key of the simulation for counter-based draws. If
+            None, draws come from RNG
+        epoch (int): index of the epoch for counter-based draws
+    Returns:
+        (EpochDraws)
+    """
+    draws = empty_draws(n)
+    fill_draws(draws, key, epoch)
+    return draws
+
+
+class EpochBuffers:
+    """
+    Draw buffers reused from epoch to epoch, so that drawing an epoch's
+    random numbers doesn't allocate once the buffers are large enough.
+    Capacity doubles whenever a generation outgrows it, so reallocations
+    are rare even in a growing population
+
+    Attributes:
+        capacity (int): number of blobs the buffers can hold
+        buffers (EpochDraws): buffers at full capacity
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        """
+        Inits EpochBuffers
+
+        Args:
+            capacity (int): number of blobs to allocate buffers for up front
+        """
+        self.capacity: int = capacity
+        self.buffers: EpochDraws = empty_draws(capacity)
+
+    def prepare(self, n: int, key: int = None, epoch: int = 0) -> EpochDraws:
+        """
+        Draws all random numbers needed by n blobs for a single epoch into
+        the reused buffers. See fill_draws. The returned views are
+        overwritten by the next call
+
+        Args:
+            n (int): number of blobs
+            key (int): 64-bit key of the simulation for counter-based draws.
+                If None, draws come from RNG
+            epoch (int): index of the epoch for counter-based draws
+        Returns:
+            (EpochDraws): views of the first n entries of each buffer
+        """
+        if n > self.capacity:
+            self.capacity = max(n, 2 * self.capacity)
+            self.buffers = empty_draws(self.capacity)
+        draws = EpochDraws(*(buf[:n] for buf in self.buffers))
+        fill_draws(draws, key, epoch)
+        return draws
+
+
+def find_closest_coords(
+    xs: np.ndarray, ys: np.ndarray, coords: np.ndarray
+) -> tuple:
+    """
+    Finds the closest coordinate to each blob, like find_closest_coord for
+    a whole generation at once. Many coordinates are searched with a single
+    k-d tree query instead of scanning every coordinate for every blob
+
+    Args:
+        xs (np.ndarray): x-coordinates of blobs
+        ys (np.ndarray): y-coordinates of blobs
+        coords (np.ndarray): (F, 2) array of coordinates to search
+    Returns:
+        Tuple: index into coords of closest coordinate and distance to it
+            for each blob. When coords is empty, indices are -1 and
+            distances are inf, the same "no coordinate" distance as
+            find_closest_coord
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) == 0:
+        return (np.full(len(xs), -1), np.full(len(xs), np.inf))
+
+    # Scanning every coordinate beats building a tree for few coordinates
+    if NUMBA_AVAILABLE and len(coords) < KDTREE_MIN_COORDS:
+        idx = np.empty(len(xs), dtype=np.int64)
+        dists = np.empty(len(xs))
+        nearest_coord(
+            xs,
+            ys,
+            np.ascontiguousarray(coords[:, 0]),
+            np.ascontiguousarray(coords[:, 1]),
+            idx,
+            dists,
+        )
+        return (idx, dists)
+
+    dists, idx = cKDTree(coords).query(
+        np.column_stack((xs, ys)), k=1, workers=-1
+    )
+    return (idx, dists)
+
+
+def get_offspring_classes(
+    blobs: Union[List, np.ndarray],
+    mut: np.ndarray = None,
+    mutates: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Determines class of offspring for every blob in blobs. Mutation events
+    for all blobs are decided with a single population-wide mask rather than
+    one draw per blob. Like BaseBlob.reproduce, mutation_prob below 0.01
+    never mutates
+
+    Args:
+        blobs (Union[List, np.ndarray]): blobs to reproduce
+        mut (np.ndarray): uniform draws for mutation events. If None, drawn
+            here
+        mutates (np.ndarray): mutation events already decided elsewhere,
+            e.g. by BlobPopulation.epoch_step. Takes precedence over mut
+    Returns:
+        (np.ndarray): class of each blob's offspring, in the same order
+    """
+    n = len(blobs)
+    if mutates is None:
+        if mut is None:
+            mut = RNG.random(size=n)
+        mutation_probs = np.fromiter(
+            (b.mutation_prob for b in blobs), dtype=np.float64, count=n
+        )
+        mutates = (mutation_probs >= 0.01) & (mut <= mutation_probs)
+    mutation_classes = np.fromiter(
+        (b.mutation_class for b in blobs), dtype=object, count=n
+    )
+    repr_classes = np.fromiter(
+        (b.repr_class for b in blobs), dtype=object, count=n
+    )
+    return np.where(mutates, mutation_classes, repr_classes)
+
+
+def reproduce_all(
+    blobs: Union[List, np.ndarray],
+    mut: np.ndarray = None,
+    mutates: np.ndarray = None,
+) -> List:
+    """
+    Reproduces every blob in blobs. See get_offspring_classes. Like custom
+    movers in BlobPopulation.move_all, blobs whose class overrides reproduce
+    fall back to calling their own reproduce
+
+    Args:
+        blobs (Union[List, np.ndarray]): blobs to reproduce
+        mut (np.ndarray): uniform draws for mutation events. If None, drawn
+            here
+        mutates (np.ndarray): mutation events already decided elsewhere
+    Returns:
+        (List): offspring of each blob, in the same order
+    """
+    classes = get_offspring_classes(blobs, mut, mutates)
+    base_reproduce = BaseBlob.reproduce
+    return [
+        cls() if type(b).reproduce is base_reproduce else b.reproduce()
+        for b, cls in zip(blobs, classes.tolist())
+    ]
+
+
+@dataclass
+class BlobPopulation:
+    """
+    Struct-of-arrays view of a single generation. Positions and steps of all
+    blobs are held in contiguous arrays so that movement can be applied to
+    the whole generation in a handful of NumPy calls instead of one Python
+    method call per blob. Positions, steps and sizes are stored as float32
+    since coordinates live in [0, 1]. survival_prob stays float64 so that it
+    round-trips exactly when written back onto blobs
+
+    Attributes:
+        blobs (np.ndarray): Blobs backing the arrays, in the same order
+        xs (np.ndarray): x-coordinates of Blobs
+        ys (np.ndarray): y-coordinates of Blobs
+        steps (np.ndarray): increment at which each Blob moves
+        sizes (np.ndarray): effective size of each Blob
+        survival_prob (np.ndarray): survival_prob of each Blob
+        reproduction_prob (np.ndarray): reproduction_prob of each Blob
+        mutation_prob (np.ndarray): mutation_prob of each Blob
+        kind (np.ndarray): int8 movement kind of each Blob
+    """
+
+    blobs: np.ndarray
+    xs: np.ndarray
+    ys: np.ndarray
+    steps: np.ndarray
+    sizes: np.ndarray
+    survival_prob: np.ndarray
+    reproduction_prob: np.ndarray
+    mutation_prob: np.ndarray
+    kind: np.ndarray
+
+    @classmethod
+    def from_blobs(cls, blobs: Union[List, np.ndarray]) -> "BlobPopulation":
+        """
+        Gathers attributes of blobs into arrays
+
+        Args:
+            blobs (Union[List, np.ndarray]): generation to gather
+        Returns:
+            (BlobPopulation)
+        """
+        n = len(blobs)
+        blob_arr = np.empty(n, dtype=object)
+        blob_arr[:] = list(blobs)
+        return cls(
+            blobs=blob_arr,
+            xs=np.fromiter((b.x for b in blobs), dtype=np.float32, count=n),
+            ys=np.fromiter((b.y for b in blobs), dtype=np.float32, count=n),
+            steps=np.fromiter(
+                (b.step for b in blobs), dtype=np.float32, count=n
+            ),
+            sizes=np.fromiter(
+                (b.size for b in blobs), dtype=np.float32, count=n
+            ),
+            survival_prob=np.fromiter(
+                (b.survival_prob for b in blobs), dtype=np.float64, count=n
+            ),
+            reproduction_prob=np.fromiter(
+                (b.reproduction_prob for b in blobs),
+                dtype=np.float64,
+                count=n,
+            ),
+            mutation_prob=np.fromiter(
+                (b.mutation_prob for b in blobs), dtype=np.float64, count=n
+            ),
+            kind=np.fromiter(
+                (get_movement_kind(b) for b in blobs), dtype=np.int8, count=n
+            ),
+        )
+
+    def __len__(self) -> int:
+        """Number of blobs in population"""
+        return len(self.blobs)
+
+    def on_gpu(self) -> bool:
+        """Whether population is large enough to be updated on the GPU, and
+        a GPU is available"""
+        return CUDA_AVAILABLE and len(self) >= CUDA_MIN_POPULATION
+
+    def move_all(self, coords: np.ndarray, draws: EpochDraws = None) -> None:
+        """
+        Moves every blob in population. Random movers step in a random
+        direction, food seekers step towards their coordinate and custom
+        movers defer to their own move method. Populations of at least
+        CUDA_MIN_POPULATION blobs are moved on the GPU when available, with
+        the same draws as on the CPU
+
+        Args:
+            coords (np.ndarray): (N, 2) array of coordinates for each blob to
+                move towards
+            draws (EpochDraws): pre-drawn random numbers for this epoch. If
+                None, drawn here
+        """
+        if draws is None:
+            draws = epoch_prepare(len(self))
+        coords = np.asarray(coords, dtype=np.float32)
+
+        if self.on_gpu():
+            move_all_cuda(
+                self.xs,
+                self.ys,
+                self.steps,
+                self.kind,
+                coords,
+                draws.dir_x,
+                draws.dir_y,
+                RANDOM_MOVER,
+                FOOD_SEEKER,
+            )
+        elif NUMBA_AVAILABLE:
+            move_random(
+                self.xs,
+                self.ys,
+                self.steps,
+                self.kind,
+                RANDOM_MOVER,
+                draws.dir_x,
+                draws.dir_y,
+            )
+            move_towards(
+                self.xs, self.ys, self.steps, self.kind, FOOD_SEEKER, coords
+            )
+        else:
+            # Sign of each step comes from direction bits (0 or 1) for random
+            # movers and from the difference to the coordinate for seekers
+            randoms = self.kind == RANDOM_MOVER
+            steps = self.steps[randoms]
+            self.xs[randoms] += np.copysign(
+                steps, 2 * draws.dir_x[randoms] - 1
+            )
+            self.ys[randoms] += np.copysign(
+                steps, 2 * draws.dir_y[randoms] - 1
+            )
+
+            seekers = self.kind == FOOD_SEEKER
+            steps = self.steps[seekers]
+            self.xs[seekers] += np.copysign(
+                steps, coords[seekers, 0] - self.xs[seekers]
+            )
+            self.ys[seekers] += np.copysign(
+                steps, coords[seekers, 1] - self.ys[seekers]
+            )
+
+        for i in np.flatnonzero(self.kind == CUSTOM_MOVER):
+            b = self.blobs[i]
+            b.move(tuple(coords[i]))
+            self.xs[i], self.ys[i] = b.x, b.y
+
+    def epoch_step(
+        self, coords: np.ndarray, draws: EpochDraws = None
+    ) -> tuple:
+        """
+        Runs a whole epoch of a food environment in a single pass over the
+        population. Every blob moves, eats if its coordinate is within reach
+        or otherwise rolls for survival, and survivors roll for reproduction
+        and mutation. Custom movers defer to their own move method first.
+        Populations moved on the GPU (see on_gpu) and populations without
+        numba move through move_all and roll with NumPy instead of the fused
+        kernel
+
+        Args:
+            coords (np.ndarray): (N, 2) array of food coordinates for each
+                blob to move towards and eat
+            draws (EpochDraws): pre-drawn random numbers for this epoch. If
+                None, drawn here
+        Returns:
+            Tuple: bool masks of blobs that survive, survivors that reproduce
+                and offspring that mutate
+        """
+        if draws is None:
+            draws = epoch_prepare(len(self))
+        coords = np.asarray(coords, dtype=np.float32)
+
+        if not NUMBA_AVAILABLE or self.on_gpu():
+            self.move_all(coords, draws)
+            dx = coords[:, 0] - self.xs
+            dy = coords[:, 1] - self.ys
+            ate = dx * dx + dy * dy <= self.sizes * self.sizes
+            survives = ate | (draws.surv < self.survival_prob)
+            reproduces = survives & (draws.rep <= self.reproduction_prob)
+            mutates = (
+                reproduces
+                & (self.mutation_prob >= 0.01)
+                & (draws.mut <= self.mutation_prob)
+            )
+            return (survives, reproduces, mutates)
+
+        for i in np.flatnonzero(self.kind == CUSTOM_MOVER):
+            b = self.blobs[i]
+            b.move(tuple(coords[i]))
+            self.xs[i], self.ys[i] = b.x, b.y
+
+        n = len(self)
+        survives = np.empty(n, dtype=np.bool_)
+        reproduces = np.empty(n, dtype=np.bool_)
+        mutates = np.empty(n, dtype=np.bool_)
+        epoch_step(
+            self.xs,
+            self.ys,
+            self.steps,
+            self.sizes,
+            self.kind,
+            coords,
+            self.survival_prob,
+            self.reproduction_prob,
+            self.mutation_prob,
+            draws.dir_x,
+            draws.dir_y,
+            draws.surv,
+            draws.rep,
+            draws.mut,
+            RANDOM_MOVER,
+            FOOD_SEEKER,
+            survives,
+            reproduces,
+            mutates,
+        )
+        return (survives, reproduces, mutates)
+
+    def find_in_reach(self, query_indices: np.ndarray) -> tuple:
+        """
+        Finds blobs within reach of each queried blob. Blobs are bucketed
+        into a uniform grid with cells as wide as the largest queried reach,
+        so only the 3x3 block of cells around each queried blob needs to be
+        scanned. Like find_blobs_in_reach, blobs at the exact same position
+        as the queried blob are excluded
+
+        Args:
+            query_indices (np.ndarray): indices of blobs to find neighbors for
+        Returns:
+            Tuple: offsets and neighbors in compressed sparse row form. The
+                neighbors of query k are neighbors[offsets[k]:offsets[k + 1]]
+        """
+        offsets = np.zeros(len(query_indices) + 1, dtype=np.intp)
+        if len(query_indices) == 0:
+            return (offsets, np.empty(0, dtype=np.intp))
+        if not NUMBA_AVAILABLE:
+            return self._query_in_reach(query_indices, offsets)
+
+        # Cells must be at least as wide as the largest reach. Blobs that
+        # have wandered outside of the environment are clamped to edge cells
+        max_reach = float(self.sizes[query_indices].max())
+        grid = max(1, min(int(1 / max_reach), 1024)) if max_reach > 0 else 1
+        cells_x = np.clip((self.xs * grid).astype(np.intp), 0, grid - 1)
+        cells_y = np.clip((self.ys * grid).astype(np.intp), 0, grid - 1)
+        cell_ids = cells_x * grid + cells_y
+        order = np.argsort(cell_ids, kind="stable")
+        cell_starts = np.searchsorted(
+            cell_ids[order], np.arange(grid * grid + 1)
+        )
+
+        args = (
+            self.xs,
+            self.ys,
+            self.sizes,
+            np.asarray(query_indices, dtype=np.intp),
+            order,
+            cell_starts,
+            cells_x,
+            cells_y,
+            grid,
+        )
+        neighbors = np.empty(0, dtype=np.intp)
+        scan_in_reach(*args, False, offsets, neighbors)
+        np.cumsum(offsets, out=offsets)
+        neighbors = np.empty(offsets[-1], dtype=np.intp)
+        scan_in_reach(*args, True, offsets, neighbors)
+        return (offsets, neighbors)
+
+    def _query_in_reach(
+        self, query_indices: np.ndarray, offsets: np.ndarray
+    ) -> tuple:
+        """
+        Finds blobs within reach of each queried blob with a single k-d tree
+        radius query. Used in place of the grid scan when numba is not
+        installed. See find_in_reach
+
+        Args:
+            query_indices (np.ndarray): indices of blobs to find neighbors for
+            offsets (np.ndarray): zeroed offsets to fill, one longer than
+                query_indices
+        Returns:
+            Tuple: offsets and neighbors in compressed sparse row form
+        """
+        xy = np.column_stack((self.xs, self.ys))
+        in_reach = cKDTree(xy).query_ball_point(
+            xy[query_indices],
+            r=self.sizes[query_indices],
+            workers=-1,
+            return_sorted=True,
+        )
+        counts = np.fromiter(
+            (len(found) for found in in_reach),
+            dtype=np.intp,
+            count=len(in_reach),
+        )
+        found = np.fromiter(
+            (j for js in in_reach for j in js),
+            dtype=np.intp,
+            count=counts.sum(),
+        )
+        query_of = np.repeat(np.arange(len(in_reach)), counts)
+        owners = np.asarray(query_indices)[query_of]
+
+        # Blobs at the exact same position are not neighbors
+        keep = (self.xs[found] != self.xs[owners]) | (
+            self.ys[found] != self.ys[owners]
+        )
+        offsets[1:] = np.bincount(query_of[keep], minlength=len(in_reach))
+        np.cumsum(offsets, out=offsets)
+        return (offsets, found[keep])
+
+    def apply_attacks(
+        self, target_indices: np.ndarray, attack_dmg: np.ndarray
+    ) -> None:
+        """
+        Damages survival_prob of attacked blobs. Attacks from all attackers
+        are applied in a single call, with blobs attacked more than once
+        taking damage from every attack. Applied on the GPU for populations
+        moved there, see on_gpu
+
+        Args:
+            target_indices (np.ndarray): indices of attacked blobs, one entry
+                per attack
+            attack_dmg (np.ndarray): damage dealt by each attack
+        """
+        if self.on_gpu():
+            apply_attacks_cuda(
+                self.survival_prob,
+                np.asarray(target_indices, dtype=np.intp),
+                np.asarray(attack_dmg, dtype=np.float64),
+            )
+            return
+        np.add.at(self.survival_prob, target_indices, -attack_dmg)
+
+    def run_from_closest(
+        self, runner_indices: np.ndarray, chaser_indices: np.ndarray
+    ) -> None:
+        """
+        Moves each runner one step directly away from the closest chaser, if
+        that chaser is within the runner's reach. Closest chasers for all
+        runners are found with a single k-d tree query
+
+        Args:
+            runner_indices (np.ndarray): indices of blobs running away
+            chaser_indices (np.ndarray): indices of blobs to run away from
+        """
+        if len(runner_indices) == 0 or len(chaser_indices) == 0:
+            return
+
+        chaser_xy = np.column_stack(
+            (self.xs[chaser_indices], self.ys[chaser_indices])
+        )
+        runner_xy = np.column_stack(
+            (self.xs[runner_indices], self.ys[runner_indices])
+        )
+        dists, closest = cKDTree(chaser_xy).query(runner_xy, k=1, workers=-1)
+        in_reach = dists <= self.sizes[runner_indices]
+        runners = runner_indices[in_reach]
+        chasers = chaser_indices[closest[in_reach]]
+        self.xs[runners] -= np.copysign(
+            self.steps[runners], self.xs[chasers] - self.xs[runners]
+        )
+        self.ys[runners] -= np.copysign(
+            self.steps[runners], self.ys[chasers] - self.ys[runners]
+        )
+
+    def write_back(self) -> None:
+        """Writes positions and survival_prob held in arrays back onto the
+        backing blobs"""
+        for b, x, y, s in zip(
+            self.blobs,
+            self.xs.tolist(),
+            self.ys.tolist(),
+            self.survival_prob.tolist(),
+        ):
+            b.x = x
+            b.y = y
+            b.survival_prob = s
+
+
+# Ids of blob names and colors in order of first appearance, so generations
+# can store them as integer columns
+NAME_REGISTRY: Dict[str, int] = {}
+COLOR_REGISTRY: Dict[str, int] = {}
+# A few dozen names and colors exist at most, so two bytes per id is plenty
+REGISTRY_ID = np.uint16
+
+
+def register(registry: Dict[str, int], value: str) -> int:
+    """
+    Gets id of value in registry, registering value if it's new
+
+    Args:
+        registry (Dict[str, int]): NAME_REGISTRY or COLOR_REGISTRY
+        value (str): name or color to look up
+    Returns:
+        (int): id of value
+    """
+    return registry.setdefault(value, len(registry))
+
+
+def registered_values(registry: Dict[str, int]) -> np.ndarray:
+    """
+    Gets all values of registry, indexable by id
+
+    Args:
+        registry (Dict[str, int]): NAME_REGISTRY or COLOR_REGISTRY
+    Returns:
+        (np.ndarray): registered values, in order of id
+    """
+    values = np.empty(len(registry), dtype=object)
+    values[list(registry.values())] = list(registry)
+    return values.astype(str)
+
+
+@dataclass
+class GenerationTable:
+    """
+    Struct-of-arrays record of a single generation, kept by environments
+    alongside the generation's blobs. Names and colors are stored as ids
+    into NAME_REGISTRY and COLOR_REGISTRY so that every column is numeric,
+    and whole generations can be masked, plotted and counted without
+    touching blobs
+
+    Attributes:
+        x (np.ndarray): x-coordinate of each Blob
+        y (np.ndarray): y-coordinate of each Blob
+        survival_prob (np.ndarray): survival_prob of each Blob
+        reproduction_prob (np.ndarray): reproduction_prob of each Blob
+        name_id (np.ndarray): uint16 id of name of each Blob
+        color_id (np.ndarray): uint16 id of color of each Blob
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    survival_prob: np.ndarray
+    reproduction_prob: np.ndarray
+    name_id: np.ndarray
+    color_id: np.ndarray
+
+    @classmethod
+    def from_blobs(cls, blobs: Union[List, np.ndarray]) -> "GenerationTable":
+        """
+        Gathers attributes of blobs into columns
+
+        Args:
+            blobs (Union[List, np.ndarray]): generation to gather
+        Returns:
+            (GenerationTable)
+        """
+        n = len(blobs)
+        return cls(
+            x=np.fromiter((b.x for b in blobs), dtype=np.float64, count=n),
+            y=np.fromiter((b.y for b in blobs), dtype=np.float64, count=n),
+            survival_prob=np.fromiter(
+                (b.survival_prob for b in blobs), dtype=np.float64, count=n
+            ),
+            reproduction_prob=np.fromiter(
+                (b.reproduction_prob for b in blobs),
+                dtype=np.float64,
+                count=n,
+            ),
+            name_id=np.fromiter(
+                (register(NAME_REGISTRY, b.name) for b in blobs),
+                dtype=REGISTRY_ID,
+                count=n,
+            ),
+            color_id=np.fromiter(
+                (register(COLOR_REGISTRY, b.color) for b in blobs),
+                dtype=REGISTRY_ID,
+                count=n,
+            ),
+        )
+
+    @classmethod
+    def concat(cls, tables: List["GenerationTable"]) -> "GenerationTable":
+        """
+        Stacks tables into one, in order
+
+        Args:
+            tables (List[GenerationTable])
+        Returns:
+            (GenerationTable)
+        """
+        return cls(
+            **{
+                f.name: np.concatenate([getattr(t, f.name) for t in tables])
+                for f in fields(cls)
+            }
+        )
+
+    def select(self, index: np.ndarray) -> "GenerationTable":
+        """
+        Selects rows of every column with the same mask or indices
+
+        Args:
+            index (np.ndarray): bool mask or integer indices of rows
+        Returns:
+            (GenerationTable)
+        """
+        return GenerationTable(
+            **{f.name: getattr(self, f.name)[index] for f in fields(self)}
+        )
+
+    def names(self) -> np.ndarray:
+        """
+        Gets name of each Blob
+
+        Returns:
+            (np.ndarray)
+        """
+        return registered_values(NAME_REGISTRY)[self.name_id]
+
+    def __len__(self) -> int:
+        """Number of blobs in generation"""
+        return len(self.name_id)
+
+    def __getstate__(self) -> Dict:
+        """Pickles names and colors as strings, since ids are only valid
+        within the process whose registries assigned them"""
+        state = self.__dict__.copy()
+        state["name_id"] = registered_values(NAME_REGISTRY)[self.name_id]
+        state["color_id"] = registered_values(COLOR_REGISTRY)[self.color_id]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """Registers pickled names and colors in this process's registries"""
+        for column, registry in (
+            ("name_id", NAME_REGISTRY),
+            ("color_id", COLOR_REGISTRY),
+        ):
+            values, inverse = np.unique(state[column], return_inverse=True)
+            ids = np.array(
+                [register(registry, v) for v in values.tolist()],
+                dtype=REGISTRY_ID,
+            )
+            state[column] = ids[inverse]
+        self.__dict__.update(state)
@@ -6,3 +6,10 @@ BLOB_DISPLAY_SIZE = 150
 FOOD_DISPLAY_SIZE = 50
 
 FIG_DIMENSIONS = (12, 12)
+
+# Populations at least this large are moved on the GPU when CUDA is available
+CUDA_MIN_POPULATION = 100000
+
+# Closest coordinates among at least this many are found with a k-d tree
+# rather than by scanning every coordinate
+KDTREE_MIN_COORDS = 256
@@ -0,0 +1,17 @@
+"""Shared pytest configuration for test suite"""
+import matplotlib
+
+# Render without a display before any module imports pyplot
+matplotlib.use("Agg", force=True)
+
+import matplotlib.pyplot as plt
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_plot_windows(monkeypatch):
+    """Keeps plotting functions from showing figures and closes every figure
+    a test opens"""
+    monkeypatch.setattr(plt, "show", lambda: None)
+    yield
+    plt.close("all")
@@ -1,5 +1,4 @@
 """Test suite for blobs"""
-import pytest
 from helpers import calculate_distance_to_coord
 from blobs import *
 
@@ -63,3 +62,20 @@ def test_foodsense_blob_move_towards_food():
     a.move(food_pos)
     end_dist = calculate_distance_to_coord((a.x, a.y), food_pos)
     assert end_dist < starting_dist
+
+
+def test_baseblob_repr_class_override_on_single_blob():
+    """Tests that overriding repr_class on one blob leaves the class-level
+    repr_class shared by other blobs untouched"""
+    a, b = BaseBlob(), BaseBlob()
+    a.set_probs(1.0, 1.0, 0.0)
+    a.repr_class = SturdyBlob
+    assert a.reproduce().name == "SturdyBlob"
+    assert b.repr_class is BaseBlob
+
+
+def test_baseblob_str():
+    """Tests that str of blob shows its name and probabilities"""
+    a = BaseBlob()
+    a.set_probs(1.0, 0.5, 0.25)
+    assert str(a) == "BaseBlob(s=1.0,r=0.5,m=0.25)"
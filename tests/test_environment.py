@@ -39,9 +39,9 @@ def one_gen_env():
         (BaseEnvironment)
     """
     b = BaseEnvironment()
-    base_pop = [BaseBlob(), MutatedBaseBlob()]
-    for p in base_pop:
-        p.set_probs(1.0, 1.0, 1.0)
+    base_pop = set_attrs_of_population(
+        [BaseBlob(), MutatedBaseBlob()], 1.0, 1.0, 1.0
+    )
     b.spawn_population(base_pop)
     return b
 
@@ -83,34 +83,46 @@ def test_interact_throws_no_errors(one_gen_env):
     assert len(one_gen_env.population) == (num_epochs + 1)
 
 
-def test_show_one_gen_first_gen_no_errors(one_gen_env, monkeypatch):
+def test_interact_keeps_tables_aligned_with_population(one_gen_env):
+    """Tests that each generation's table holds the same blobs, in the same
+    order, as the generation itself"""
+    for i in range(3):
+        one_gen_env.interact()
+    for gen, table in zip(one_gen_env.population, one_gen_env.tables):
+        assert list(table.names()) == [b.name for b in gen]
+        assert list(table.x) == [b.x for b in gen]
+
+
+def test_interact_uses_probs_changed_after_spawn(one_gen_env):
+    """Tests that interact uses probabilities set on blobs after they were
+    spawned"""
+    for b in one_gen_env.population[-1]:
+        b.set_probs(0.0, 1.0, 1.0)
+    one_gen_env.interact()
+    assert len(one_gen_env.population[-1]) == 0
+
+
+def test_show_one_gen_first_gen_no_errors(one_gen_env):
     """Tests that show function on first generation doesn't throw any runtime
     errors"""
-    # pytest fixture to close matplotlib figure on display
-    monkeypatch.setattr(plt, "show", lambda: None)
     one_gen_env.show_one_generation(0)
 
 
-def test_show_one_gen_last_gen_no_errors(one_gen_env, monkeypatch):
+def test_show_one_gen_last_gen_no_errors(one_gen_env):
     """Tests that show function on last generation doesn't throw any runtime
     errors"""
-    monkeypatch.setattr(plt, "show", lambda: None)
     one_gen_env.show_one_generation(-1)
 
 
-def test_plot_growth_no_errors(one_gen_env, starting_population, monkeypatch):
+def test_plot_growth_no_errors(one_gen_env, starting_population):
     """Tests that plot growth doesn't throw any runtime errors"""
     one_gen_env.spawn_population(starting_population)
-    monkeypatch.setattr(plt, "show", lambda: None)
     one_gen_env.plot_growth()
 
 
-def test_show_all_generations_no_errors(
-    one_gen_env, starting_population, monkeypatch
-):
+def test_show_all_generations_no_errors(one_gen_env, starting_population):
     """Tests show_all_generations shows no runtime errors"""
     one_gen_env.spawn_population(starting_population)
-    monkeypatch.setattr(plt, "show", lambda: None)
     one_gen_env.show_all_generations()
 
 
@@ -126,21 +138,162 @@ def test_foodenv_interact_adds_food_and_population():
     assert (len(e.food_coords) == 2) and (len(e.population) == 2)
 
 
-def test_foodenv_plots(monkeypatch):
+def test_foodenv_spawn_food_spawns_coordinate_array():
+    """Tests that spawn_food spawns an (F, 2) array of coordinates within the
+    environment"""
+    e = EnvironmentWithFood(food=5)
+    e.spawn_food()
+    assert e.food_coords[-1].shape == (5, 2)
+    assert ((e.food_coords[-1] >= 0) & (e.food_coords[-1] < 1)).all()
+
+
+def test_foodenv_plots():
     """Tests that foodenv plotting functions don't throw errors. Note that I
     intentionally chose to wrap multiple tests into a single once since
     the individual plotting functions are already tested previously"""
     # Setup dummy environment with interacted blobs
     e = EnvironmentWithFood(food=3)
-    pop = [BaseBlob()] + [HungryBlob() for z in range(3)]
-    for p in pop:
-        p.set_probs(1.0, 1.0, 1.0)
+    pop = set_attrs_of_population(
+        [BaseBlob()] + [HungryBlob() for z in range(3)], 1.0, 1.0, 1.0
+    )
     e.spawn_population(pop)
 
     for i in range(3):
         e.interact()
     # Plot all available plotting functions
-    monkeypatch.setattr(plt, "show", lambda: None)
     e.show_one_generation(-1)
     e.show_all_generations()
     e.plot_growth()
+
+
+def test_event_buffer_is_kept_per_environment():
+    """Tests that event_buffer reuses an environment's buffer, grows it when
+    a generation outgrows it, and isn't shared between environments"""
+    e, other = BaseEnvironment(), BaseEnvironment()
+    small = e.event_buffer(3)
+    assert np.shares_memory(small, e.event_buffer(2))
+    assert len(e.event_buffer(10)) == 10
+    assert not np.shares_memory(e.event_buffer(3), other.event_buffer(3))
+
+
+def test_evolve_many_evolves_each_environment():
+    """Tests that evolve_many adds n_gens generations to every environment"""
+    envs = [EnvironmentWithFood(food=3) for i in range(2)]
+    for e in envs:
+        e.spawn_population([HungryBlob() for i in range(3)])
+    evolved = evolve_many(envs, 2, max_workers=1)
+    assert [len(e.population) for e in evolved] == [3, 3]
+
+
+def test_evolve_many_spawns_different_food():
+    """Tests that unseeded environments evolved by evolve_many don't all
+    spawn the same food"""
+    envs = [EnvironmentWithFood(food=3) for i in range(3)]
+    for e in envs:
+        e.spawn_population([HungryBlob() for i in range(3)])
+    evolved = evolve_many(envs, 2, max_workers=1)
+    foods = [np.concatenate(e.food_coords[1:]) for e in evolved]
+    assert not np.array_equal(foods[0], foods[1])
+    assert not np.array_equal(foods[1], foods[2])
+
+
+def test_interactive_env_calls_overridden_attacker_interaction():
+    """Tests that AttackingBlobs whose class overrides
+    interact_with_surroundings still have it called"""
+    calls = []
+
+    class CountingAttacker(AttackingBlob):
+        def interact_with_surroundings(self, interaction_list):
+            calls.append(len(interaction_list))
+
+    e = InteractiveEnvironment(food=3)
+    pop = [CountingAttacker(), AttackingBlob(), BaseBlob()]
+    for p in pop:
+        p.x, p.y = 0.5, 0.5
+    e.spawn_population(pop)
+    e.interact()
+    assert len(calls) == 1
+
+
+def test_interactive_env_calls_overridden_run_away():
+    """Tests that TimidBlobs whose class overrides run_away still run away
+    with it"""
+    calls = []
+
+    class CountingTimid(TimidBlob):
+        def run_away(self, coords):
+            calls.append(coords)
+
+    e = InteractiveEnvironment(food=3)
+    pop = [CountingTimid(), AttackingBlob()]
+    for p in pop:
+        p.x, p.y = 0.5, 0.5
+        p.step = 0.0
+    pop[1].x = 0.55
+    e.spawn_population(pop)
+    e.interact()
+    assert len(calls) == 1
+
+
+def test_seeded_foodenv_is_reproducible():
+    """Tests that seeded food environments starting from the same
+    population evolve the same way"""
+    runs = []
+    for i in range(2):
+        e = EnvironmentWithFood(food=5, seed=7)
+        pop = [HungryBlob() for j in range(4)] + [BaseBlob() for j in range(4)]
+        for j, p in enumerate(pop):
+            p.x, p.y = j / 8, 1 - j / 8
+        e.spawn_population(pop)
+        for j in range(3):
+            e.interact()
+        runs.append(e)
+    assert np.array_equal(runs[0].food_coords[-1], runs[1].food_coords[-1])
+    assert [(b.name, b.x, b.y) for b in runs[0].population[-1]] == [
+        (b.name, b.x, b.y) for b in runs[1].population[-1]
+    ]
+
+
+def test_seeded_interactive_env_is_reproducible():
+    """Tests that seeded interactive environments starting from the same
+    population evolve the same way, whatever the state of the shared
+    generators"""
+    runs = []
+    for i in range(2):
+        random.seed(i)
+        RNG.random(i + 1)
+        e = InteractiveEnvironment(food=5, seed=7)
+        pop = (
+            [QuickBlob() for j in range(3)]
+            + [AttackingBlob() for j in range(3)]
+            + [TimidBlob() for j in range(3)]
+            + [BaseBlob() for j in range(3)]
+        )
+        for j, p in enumerate(pop):
+            p.x, p.y = j / 12, 1 - j / 12
+        e.spawn_population(pop)
+        for j in range(3):
+            e.interact()
+        runs.append(e)
+    assert np.array_equal(runs[0].food_coords[-1], runs[1].food_coords[-1])
+    assert [(b.name, b.x, b.y) for b in runs[0].population[-1]] == [
+        (b.name, b.x, b.y) for b in runs[1].population[-1]
+    ]
+
+
+def test_seed_makes_unseeded_runs_reproducible():
+    """Tests that seeding the shared generators makes runs of unseeded
+    environments reproducible"""
+    runs = []
+    for i in range(2):
+        seed(11)
+        e = InteractiveEnvironment(food=5)
+        e.spawn_population(
+            [QuickBlob() for j in range(3)] + [SturdyBlob() for j in range(3)]
+        )
+        for j in range(3):
+            e.interact()
+        runs.append(e)
+    assert [(b.name, b.x, b.y) for b in runs[0].population[-1]] == [
+        (b.name, b.x, b.y) for b in runs[1].population[-1]
+    ]
@@ -6,12 +6,12 @@ from helpers import *
 
 
 @pytest.fixture
-def dummy_population() -> np.ndarray:
+def dummy_population() -> List:
     """
     Setup fixture for generic, but varied, population
 
     Returns:
-        (np.ndarray)
+        (List)
     """
     b = BaseBlob()
     b.set_probs(0.5, 1.0, 1.0)
@@ -19,8 +19,7 @@ def dummy_population() -> np.ndarray:
     m.set_probs(0.3, 1.0, 1.0)
     b2 = BaseBlob()
     b2.set_probs(0.5, 0.5, 0.5)
-    all_b = [[b for x in range(2)] + [m for y in range(2)], [b2]]
-    return np.array(all_b, dtype=object)
+    return [[b for x in range(2)] + [m for y in range(2)], [b2]]
 
 
 @pytest.fixture
@@ -53,6 +52,17 @@ def test_get_pivot_indices_splits_correct_indices(dummy_population):
     assert list(indices[1]) == [1, 3]
 
 
+def test_seed_reseeds_shared_generators():
+    """Tests that seed makes RNG, as bound by other modules, and random
+    repeat their draws"""
+    import population
+
+    seed(3)
+    first = (population.RNG.random(), random.random())
+    seed(3)
+    assert (RNG.random(), random.random()) == first
+
+
 def test_apply_mask_properly_applies_mask(dummy_population, dummy_attributes):
     """Tests that apply_mask_to_population properly masks population on
     attribute values"""
@@ -62,12 +72,39 @@ def test_apply_mask_properly_applies_mask(dummy_population, dummy_attributes):
     assert len(masked_pop) == 0  # Since set attributes to 0, none above mask
 
 
+def test_apply_mask_keeps_certain_events(dummy_population):
+    """Tests that apply_mask_to_population keeps every blob whose attribute
+    is 1.0 and returns a boolean mask"""
+    masked_pop, mask = apply_mask_to_population(
+        list(dummy_population[0]), np.ones(4)
+    )
+    assert len(masked_pop) == 4 and mask.dtype == np.bool_
+
+
+def test_apply_mask_draws_into_out(dummy_population):
+    """Tests that apply_mask_to_population draws events into out when
+    given one"""
+    out = np.zeros(4)
+    masked_pop, mask = apply_mask_to_population(
+        list(dummy_population[0]), np.ones(4), out=out
+    )
+    assert len(masked_pop) == 4 and np.all(out >= 0.1)
+
+
 def test_get_generation_attributes(dummy_population):
     """Tests that get_generation_attributes retrieves correct attribute values"""
     attrs = get_generation_attributes(dummy_population[0], "survival_prob")
     assert list(attrs) == [0.5, 0.5, 0.3, 0.3]
 
 
+def test_get_generation_attributes_non_numeric(dummy_population):
+    """Tests that get_generation_attributes gets non-numeric attributes"""
+    names = get_generation_attributes(dummy_population[0], "name")
+    assert list(names) == ["BaseBlob"] * 2 + ["MutatedBaseBlob"] * 2
+    colors = get_generation_attributes(dummy_population[1], "color")
+    assert list(colors) == ["blue"]
+
+
 def test_get_population_at_each_gen_retrieves_proper_counts(dummy_population):
     """Tests that get_population_at_each_generation retrieves proper count
     of blob types across entire population"""
@@ -102,6 +139,17 @@ def test_find_closest_coord():
     assert closest == (0.01, 0.01)
 
 
+def test_find_closest_coord_array_matches_list():
+    """Tests that find_closest_coord finds the same coordinate and distance
+    in an array of coordinates as in a list of them"""
+    food_list = [(0.8, 0.1), (0.2, 0.3), (0.5, 0.9)]
+    closest, dist = find_closest_coord((0.1, 0.1), food_list)
+    arr_closest, arr_dist = find_closest_coord(
+        (0.1, 0.1), np.array(food_list)
+    )
+    assert tuple(arr_closest) == closest and np.isclose(arr_dist, dist)
+
+
 def test_calculate_dist_to_food():
     """Tests that calculate_distance_to_coord calculates the proper distance"""
     b = PerfectTestBlob()
@@ -110,6 +158,16 @@ def test_calculate_dist_to_food():
     assert calculate_distance_to_coord((b.x, b.y), food_pos) == 2.0 ** (1 / 2)
 
 
+def test_calculate_distances_to_coords():
+    """Tests that calculate_distances_to_coords matches
+    calculate_distance_to_coord for each blob"""
+    xs, ys = np.array([0.0, 0.5]), np.array([0.0, 0.5])
+    coords = np.array([[1.0, 1.0], [0.5, 0.9]])
+    dists = calculate_distances_to_coords(xs, ys, coords)
+    for x, y, coord, dist in zip(xs, ys, coords, dists):
+        assert np.isclose(calculate_distance_to_coord((x, y), coord), dist)
+
+
 def test_determine_number_survivors_of_type_properly_counts():
     """Tests that determine_number_survivors_of_type returns proper value for if
     blobtype present"""
@@ -150,6 +208,15 @@ def test_try_to_eat():
     assert try_to_eat(ref_blob, 0.05, [])
     assert not try_to_eat(ref_blob, 0.2, [])
 
+
+def test_eat_and_survive():
+    """Tests that eat_and_survive lets blobs within range of food survive
+    and blobs outside of range survive only by their survival_prob"""
+    survives = eat_and_survive(
+        np.array([0.05, 0.2, 0.2]), np.full(3, 0.1), np.array([0.0, 0.0, 1.0])
+    )
+    assert list(survives) == [True, False, True]
+
 def test_set_attrs_of_population_missing_attrs(dummy_population):
     """Test that set_attrs_of_population will throw ValueError if no
     attrs are passed"""
@@ -174,6 +241,22 @@ def test_set_attrs_of_population_three_attr(dummy_population):
             for b in changed_pop]
     assert set(all_attrs) == {srm}
 
+def test_set_attrs_of_population_keeps_own_attrs(dummy_population):
+    """Test that set_attrs_of_population keeps each blob's own value of
+    attrs that aren't passed and leaves the original blobs untouched"""
+    changed_pop = set_attrs_of_population(dummy_population[0], r=0.7)
+    assert [b.survival_prob for b in changed_pop] == [0.5, 0.5, 0.3, 0.3]
+    assert dummy_population[0][0].reproduction_prob == 1.0
+
+def test_set_attrs_of_population_copies_own_attrs():
+    """Test that set_attrs_of_population copies mutable attributes blobs
+    hold of their own rather than sharing them with the original"""
+    b = BaseBlob()
+    b.history = []
+    changed = set_attrs_of_population([b], s=0.1)[0]
+    changed.history.append(1)
+    assert b.history == []
+
 def test_determine_most_prevalent_blob_single_pop():
     """Tests that `determine_most_prevalent_blob` accurately finds the blob
     that's most prevalent in a single generation"""
@@ -187,3 +270,18 @@ def test_determine_most_prevalent_blob_multiple_pops():
     pop_list = [[BaseBlob() for x in range(5)] + [MutatedBaseBlob() for y in range(3)]]
     final_gen = pop_list.append([HungryBlob()])
     assert determine_most_prevalent_blob(pop_list) == 'HungryBlob'
+
+def test_determine_most_prevalent_blob_tie():
+    """Tests that `determine_most_prevalent_blob` breaks ties by picking the
+    alphabetically first name"""
+    pop_list = [[SturdyBlob(), SturdyBlob(), BaseBlob(), BaseBlob()]]
+    assert determine_most_prevalent_blob(pop_list) == 'BaseBlob'
+
+
+def test_get_population_at_each_gen_counts_dead_generations():
+    """Tests that get_population_at_each_generation counts 0 of every type
+    in generations that have died off"""
+    type_counts, _ = get_population_at_each_generation(
+        [[BaseBlob(), SturdyBlob()], []]
+    )
+    assert type_counts == {"BaseBlob": [1, 0], "SturdyBlob": [1, 0]}
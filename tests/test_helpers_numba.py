@@ -0,0 +1,111 @@
+"""Test suite for numba-compiled kernels"""
+import numpy as np
+from helpers_numba import *
+
+
+def test_move_towards_only_moves_target_kind():
+    """Tests that move_towards moves blobs of the target kind towards their
+    coordinate and leaves other blobs in place"""
+    xs = np.array([0.5, 0.5], dtype=np.float32)
+    ys = np.array([0.5, 0.5], dtype=np.float32)
+    steps = np.array([0.1, 0.1], dtype=np.float32)
+    kind = np.array([1, 0], dtype=np.int8)
+    coords = np.array([[1.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+
+    move_towards(xs, ys, steps, kind, 1, coords)
+    assert np.allclose(xs, [0.6, 0.5]) and np.allclose(ys, [0.4, 0.5])
+
+
+def test_move_random_follows_direction_bits():
+    """Tests that move_random steps in the direction given by the direction
+    bits"""
+    xs = np.array([0.5, 0.5], dtype=np.float32)
+    ys = np.array([0.5, 0.5], dtype=np.float32)
+    steps = np.array([0.1, 0.1], dtype=np.float32)
+    kind = np.array([0, 0], dtype=np.int8)
+
+    dir_x = np.array([1, 0], dtype=np.int8)
+    dir_y = np.array([0, 1], dtype=np.int8)
+
+    move_random(xs, ys, steps, kind, 0, dir_x, dir_y)
+    assert np.allclose(xs, [0.6, 0.4]) and np.allclose(ys, [0.4, 0.6])
+
+
+def test_epoch_step_decides_survival_reproduction_and_mutation():
+    """Tests that epoch_step moves blobs, lets blobs reaching their food
+    survive, and only lets survivors reproduce and mutate"""
+    xs = np.array([0.5, 0.5, 0.5], dtype=np.float32)
+    ys = np.array([0.5, 0.5, 0.5], dtype=np.float32)
+    steps = np.full(3, 0.1, dtype=np.float32)
+    sizes = np.full(3, 0.1, dtype=np.float32)
+    kind = np.array([1, 1, 1], dtype=np.int8)
+    coords = np.array([[0.6, 0.6], [0.0, 0.0], [0.0, 0.0]], dtype=np.float32)
+    probs = np.ones(3)
+    zeros = np.zeros(3, dtype=np.int8)
+    # Second blob can't reach food but survives its roll, third doesn't
+    surv = np.array([1.0, 0.0, 1.0])
+    rep = np.full(3, 0.5)
+    mut = np.full(3, 0.5)
+    survives = np.empty(3, dtype=np.bool_)
+    reproduces = np.empty(3, dtype=np.bool_)
+    mutates = np.empty(3, dtype=np.bool_)
+
+    epoch_step(
+        xs,
+        ys,
+        steps,
+        sizes,
+        kind,
+        coords,
+        probs * 0.5,
+        probs,
+        probs,
+        zeros,
+        zeros,
+        surv,
+        rep,
+        mut,
+        0,
+        1,
+        survives,
+        reproduces,
+        mutates,
+    )
+    assert np.allclose(xs, [0.6, 0.4, 0.4])
+    assert list(survives) == [True, True, False]
+    assert list(reproduces) == [True, True, False]
+    assert list(mutates) == [True, True, False]
+
+
+def test_squares32_matches_on_arrays():
+    """Tests that squares32 gives the same bits for scalars and arrays"""
+    key = np.uint64(0x9E3779B97F4A7C15)
+    ctrs = np.arange(4, dtype=np.uint64)
+    bits = squares32(ctrs, key)
+    assert list(bits) == [squares32(c, key) for c in ctrs]
+    assert (bits < 2 ** 32).all()
+
+
+def test_nearest_coord_finds_closest():
+    """Tests that nearest_coord finds index of and distance to the closest
+    coordinate of each blob"""
+    xs = np.array([0.0, 1.0])
+    ys = np.array([0.0, 1.0])
+    coord_xs = np.array([0.9, 0.0, 0.5])
+    coord_ys = np.array([1.0, 0.1, 0.5])
+    idx = np.empty(2, dtype=np.int64)
+    dist = np.empty(2)
+
+    nearest_coord(xs, ys, coord_xs, coord_ys, idx, dist)
+    assert list(idx) == [1, 0] and np.allclose(dist, [0.1, 0.1])
+
+
+def test_nearest_coord_without_coords():
+    """Tests that nearest_coord gives index -1 and distance inf when there
+    are no coordinates"""
+    idx = np.empty(2, dtype=np.int64)
+    dist = np.empty(2)
+
+    empty = np.empty(0)
+    nearest_coord(np.zeros(2), np.zeros(2), empty, empty, idx, dist)
+    assert list(idx) == [-1, -1] and np.isinf(dist).all()
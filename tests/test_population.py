@@ -0,0 +1,300 @@
+"""Test suite for population containers"""
+import numpy as np
+import pytest
+from blobs import *
+from helpers_cuda import CUDA_AVAILABLE
+from population import *
+
+
+@pytest.fixture
+def mixed_population() -> BlobPopulation:
+    """
+    Sets up a population with one random mover and one food seeker, both
+    placed at the center of the environment
+
+    Returns:
+        (BlobPopulation)
+    """
+    blobs = [BaseBlob(), HungryBlob()]
+    for b in blobs:
+        b.x, b.y = 0.5, 0.5
+    return BlobPopulation.from_blobs(blobs)
+
+
+def test_from_blobs_gathers_attributes(mixed_population):
+    """Tests that from_blobs gathers positions and movement kinds of blobs"""
+    assert list(mixed_population.xs) == [0.5, 0.5]
+    assert list(mixed_population.kind) == [RANDOM_MOVER, FOOD_SEEKER]
+
+
+def test_move_all_moves_in_correct_increment(mixed_population):
+    """Tests that move_all moves every blob by its step in each direction"""
+    mixed_population.move_all(np.array([[1.0, 1.0], [1.0, 1.0]]))
+    assert np.allclose(np.abs(mixed_population.xs - 0.5), 0.1)
+    assert np.allclose(np.abs(mixed_population.ys - 0.5), 0.1)
+
+
+def test_move_all_moves_food_seekers_towards_food(mixed_population):
+    """Tests that food seekers move towards their coordinate"""
+    mixed_population.move_all(np.array([[1.0, 1.0], [0.0, 1.0]]))
+    assert mixed_population.xs[1] < 0.5
+    assert mixed_population.ys[1] > 0.5
+
+
+def test_write_back_updates_blobs(mixed_population):
+    """Tests that write_back sets positions held in arrays onto blobs"""
+    mixed_population.xs[:] = 0.25
+    mixed_population.write_back()
+    assert [b.x for b in mixed_population.blobs] == [0.25, 0.25]
+
+
+def test_reproduce_all_guaranteed_mutation():
+    """Tests that reproduce_all mutates blobs whose mutation draw falls
+    within their mutation_prob"""
+    a = PerfectTestBlob()
+    a.set_probs(1.0, 1.0, 1.0)
+    offspring = reproduce_all([a], mut=np.array([0.5]))
+    assert offspring[0].name == "MutatedBaseBlob"
+
+
+def test_reproduce_all_no_mutation():
+    """Tests that reproduce_all never mutates blobs with no mutation prob"""
+    a = BaseBlob()
+    a.set_probs(1.0, 1.0, 0.0)
+    offspring = reproduce_all([a, a], mut=np.array([0.0, 0.0]))
+    assert [b.name for b in offspring] == ["BaseBlob", "BaseBlob"]
+
+
+def test_apply_attacks_stacks_repeated_targets(mixed_population):
+    """Tests that apply_attacks applies damage from every attack, including
+    multiple attacks on the same blob"""
+    mixed_population.survival_prob[:] = 1.0
+    mixed_population.apply_attacks(np.array([0, 0, 1]), np.full(3, 0.2))
+    assert np.allclose(mixed_population.survival_prob, [0.6, 0.8])
+
+
+def test_run_from_closest_runs_from_chaser_in_reach():
+    """Tests that run_from_closest moves runners away from the closest chaser
+    within reach and leaves runners without a chaser in reach in place"""
+    runners = [TimidBlob(), TimidBlob()]
+    runners[0].x, runners[0].y = 0.5, 0.5
+    runners[1].x, runners[1].y = 0.1, 0.1
+    chaser = AttackingBlob()
+    chaser.x, chaser.y = 0.6, 0.6
+    pop = BlobPopulation.from_blobs(runners + [chaser])
+
+    pop.run_from_closest(np.array([0, 1]), np.array([2]))
+    assert np.allclose(pop.xs[:2], [0.4, 0.1])
+    assert np.allclose(pop.ys[:2], [0.4, 0.1])
+
+
+def test_get_offspring_classes_selects_by_mutation_mask():
+    """Tests that get_offspring_classes picks mutation_class for blobs that
+    mutate and repr_class for the rest"""
+    a = HungryBlob()
+    a.set_probs(1.0, 1.0, 0.5)
+    classes = get_offspring_classes([a, a], mut=np.array([0.1, 0.9]))
+    assert list(classes) == [MutatedHungryBlob, HungryBlob]
+
+
+def test_find_in_reach_finds_neighbors_within_reach():
+    """Tests that find_in_reach finds blobs within reach of each queried blob,
+    excluding blobs at the same position"""
+    blobs = [BaseBlob() for b in range(4)]
+    positions = [(0.0, 0.0), (0.1, 0.1), (0.9, 0.9), (0.0, 0.0)]
+    for b, (x, y) in zip(blobs, positions):
+        b.x, b.y = x, y
+        b.size = 0.2
+    pop = BlobPopulation.from_blobs(blobs)
+
+    offsets, neighbors = pop.find_in_reach(np.array([0, 2]))
+    assert list(neighbors[offsets[0] : offsets[1]]) == [1]
+    assert len(neighbors[offsets[1] : offsets[2]]) == 0
+
+
+def test_find_in_reach_without_numba(monkeypatch):
+    """Tests that the k-d tree query used without numba finds the same
+    neighbors as the grid scan"""
+    import population
+
+    blobs = [BaseBlob() for b in range(50)]
+    for b in blobs:
+        b.size = 0.2
+    blobs[1].x, blobs[1].y = blobs[0].x, blobs[0].y
+    pop = BlobPopulation.from_blobs(blobs)
+    queries = np.arange(0, 50, 2)
+
+    offsets, neighbors = pop.find_in_reach(queries)
+    monkeypatch.setattr(population, "NUMBA_AVAILABLE", False)
+    tree_offsets, tree_neighbors = pop.find_in_reach(queries)
+    assert np.array_equal(offsets, tree_offsets)
+    for k in range(len(queries)):
+        assert sorted(neighbors[offsets[k] : offsets[k + 1]]) == list(
+            tree_neighbors[offsets[k] : offsets[k + 1]]
+        )
+
+
+def test_epoch_step_feeds_blobs_reaching_food(mixed_population):
+    """Tests that epoch_step lets blobs that reach their food survive even
+    when their survival roll fails"""
+    mixed_population.survival_prob[:] = 0.0
+    survives, reproduces, mutates = mixed_population.epoch_step(
+        np.array([[0.9, 0.9], [0.55, 0.55]])
+    )
+    assert list(survives) == [False, True]
+    assert not reproduces[0] and not mutates[0]
+
+
+def test_epoch_prepare_counter_draws_are_reproducible():
+    """Tests that counter-based draws depend only on key, epoch and blob
+    index"""
+    a = epoch_prepare(10, key=0x9E3779B97F4A7C15, epoch=3)
+    b = epoch_prepare(20, key=0x9E3779B97F4A7C15, epoch=3)
+    c = epoch_prepare(10, key=0x9E3779B97F4A7C15, epoch=4)
+    assert all(np.array_equal(x, y[:10]) for x, y in zip(a, b))
+    assert not np.array_equal(a.mut, c.mut)
+    assert ((a.rep >= 0.1) & (a.rep < 1.0)).all()
+
+
+def test_counter_draws_without_numba(monkeypatch):
+    """Tests that counter-based draws computed with NumPy match the numba
+    kernel without warning about wrapping uint64 arithmetic"""
+    import warnings
+    import population
+
+    key = 0x9E3779B97F4A7C15
+    expected = epoch_prepare(10, key=key, epoch=3)
+    monkeypatch.setattr(population, "NUMBA_AVAILABLE", False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        draws = epoch_prepare(10, key=key, epoch=3)
+    assert all(np.allclose(a, b) for a, b in zip(expected, draws))
+
+
+def test_epoch_buffers_reuse_and_grow():
+    """Tests that EpochBuffers hands out views of the same buffers until a
+    larger generation forces them to grow"""
+    buffers = EpochBuffers(4)
+    a = buffers.prepare(3)
+    b = buffers.prepare(4)
+    assert np.shares_memory(a.mut, b.mut)
+    c = buffers.prepare(5)
+    assert buffers.capacity == 8 and len(c.mut) == 5
+    assert set(np.unique(c.dir_x)) <= {0, 1}
+
+
+def test_generation_table_select_and_concat():
+    """Tests that GenerationTable selects and stacks rows of every column
+    together"""
+    table = GenerationTable.from_blobs([BaseBlob(), SturdyBlob()])
+    stacked = GenerationTable.concat([table, table.select([1])])
+    assert list(stacked.names()) == ["BaseBlob", "SturdyBlob", "SturdyBlob"]
+    assert list(stacked.survival_prob) == [0.5, 0.8, 0.8]
+
+
+def test_find_closest_coords_matches_find_closest_coord():
+    """Tests that find_closest_coords agrees with find_closest_coord"""
+    from helpers import find_closest_coord
+
+    coords = [(0.2, 0.3), (0.8, 0.1), (0.5, 0.9)]
+    xs, ys = np.array([0.1, 0.7, 0.4]), np.array([0.1, 0.2, 0.6])
+    idx, dists = find_closest_coords(xs, ys, coords)
+    for x, y, i, d in zip(xs, ys, idx, dists):
+        closest, dist = find_closest_coord((x, y), coords)
+        assert coords[i] == closest and np.isclose(d, dist)
+
+
+def test_find_closest_coords_without_coords():
+    """Tests that find_closest_coords gives distance inf, like
+    find_closest_coord, when there are no coordinates"""
+    idx, dists = find_closest_coords([0.5], [0.5], np.empty((0, 2)))
+    assert list(idx) == [-1] and dists[0] == find_closest_coord((0.5, 0.5), [])[1]
+
+
+def test_find_closest_coords_with_kd_tree(monkeypatch):
+    """Tests that find_closest_coords finds the same coordinates when
+    searching with a k-d tree"""
+    import population
+
+    xs, ys = np.random.rand(20), np.random.rand(20)
+    coords = np.random.rand(30, 2)
+    scanned = find_closest_coords(xs, ys, coords)
+    monkeypatch.setattr(population, "KDTREE_MIN_COORDS", 0)
+    queried = find_closest_coords(xs, ys, coords)
+    assert np.array_equal(scanned[0], queried[0])
+    assert np.allclose(scanned[1], queried[1])
+
+
+def test_reproduce_all_defers_to_custom_reproduce():
+    """Tests that reproduce_all calls reproduce of blobs whose class
+    overrides it"""
+
+    class ClonalBlob(BaseBlob):
+        def reproduce(self):
+            return SturdyBlob()
+
+    offspring = reproduce_all([ClonalBlob(), BaseBlob()], mut=np.ones(2))
+    assert [b.name for b in offspring] == ["SturdyBlob", "BaseBlob"]
+
+
+def test_generation_table_pickles_names(monkeypatch):
+    """Tests that a pickled GenerationTable keeps its names even when the
+    registries assign different ids"""
+    import pickle
+    import population
+
+    table = GenerationTable.from_blobs([SturdyBlob(), BaseBlob()])
+    pickled = pickle.dumps(table)
+    monkeypatch.setattr(population, "NAME_REGISTRY", {"UnpickledFirst": 0})
+    assert list(pickle.loads(pickled).names()) == ["SturdyBlob", "BaseBlob"]
+
+
+def test_registered_values_are_indexed_by_id():
+    """Tests that registered_values places each value at its id, whatever
+    order values were registered in"""
+    registry = {"SturdyBlob": 1, "BaseBlob": 2, "HungryBlob": 0}
+    assert list(registered_values(registry)) == [
+        "HungryBlob",
+        "SturdyBlob",
+        "BaseBlob",
+    ]
+
+
+def test_epoch_step_moves_large_populations_on_gpu(monkeypatch):
+    """Tests that epoch_step moves populations through the GPU path once
+    they reach CUDA_MIN_POPULATION"""
+    import population
+
+    calls = []
+    monkeypatch.setattr(population, "CUDA_AVAILABLE", True)
+    monkeypatch.setattr(population, "CUDA_MIN_POPULATION", 2)
+    monkeypatch.setattr(
+        population, "move_all_cuda", lambda *args: calls.append(args)
+    )
+    pop = BlobPopulation.from_blobs([BaseBlob(), HungryBlob()])
+    survives, _, _ = pop.epoch_step(np.array([[0.5, 0.5], [0.5, 0.5]]))
+    assert len(calls) == 1 and len(survives) == 2
+
+
+@pytest.mark.skipif(not CUDA_AVAILABLE, reason="requires a CUDA device")
+def test_gpu_matches_cpu(monkeypatch):
+    """Tests that moving and attacking on the GPU gives the same results as
+    on the CPU for the same draws"""
+    import population
+
+    blobs = [BaseBlob() for b in range(20)] + [HungryBlob() for b in range(20)]
+    coords = np.random.rand(40, 2)
+    draws = epoch_prepare(40)
+    targets = np.array([0, 0, 5, 39])
+    dmg = np.full(4, 0.1)
+
+    cpu = BlobPopulation.from_blobs(blobs)
+    cpu.move_all(coords, draws)
+    cpu.apply_attacks(targets, dmg)
+    monkeypatch.setattr(population, "CUDA_MIN_POPULATION", 0)
+    gpu = BlobPopulation.from_blobs(blobs)
+    assert gpu.on_gpu()
+    gpu.move_all(coords, draws)
+    gpu.apply_attacks(targets, dmg)
+    assert np.allclose(cpu.xs, gpu.xs) and np.allclose(cpu.ys, gpu.ys)
+    assert np.allclose(cpu.survival_prob, gpu.survival_prob)